@@ -116,29 +116,57 @@ def upgrade() -> None:
     op.create_index(op.f('ix_stripe_webhooks_stripe_customer_id'), 'stripe_webhooks', ['stripe_customer_id'], unique=False)
 
     # Insert default token pricing
-    current_time = datetime.utcnow().isoformat()
-    default_pricing_id = str(uuid.uuid4())
-    op.execute(
-        f"""
-        INSERT INTO token_pricing (id, usd_per_1k_tokens, effective_date, created_at, updated_at, is_deleted)
-        VALUES ('{default_pricing_id}', 0.02, '{current_time}', '{current_time}', '{current_time}', false)
-        """
+    current_time = datetime.utcnow()
+    token_pricing_table = sa.table('token_pricing',
+        sa.column('id', sa.UUID()),
+        sa.column('usd_per_1k_tokens', sa.Float()),
+        sa.column('effective_date', sa.DateTime()),
+        sa.column('created_at', sa.DateTime()),
+        sa.column('updated_at', sa.DateTime()),
+        sa.column('is_deleted', sa.Boolean()),
     )
+    op.bulk_insert(token_pricing_table, [
+        {
+            'id': uuid.uuid4(),
+            'usd_per_1k_tokens': 0.02,
+            'effective_date': current_time,
+            'created_at': current_time,
+            'updated_at': current_time,
+            'is_deleted': False,
+        },
+    ])
     
     # Insert default subscription tiers
-    free_tier_id = str(uuid.uuid4())
-    pro_tier_id = str(uuid.uuid4())
-    enterprise_tier_id = str(uuid.uuid4())
-    
-    op.execute(
-        f"""
-        INSERT INTO subscription_tiers (id, plan_name, token_limit, billing_cycle, stripe_price_id, description, created_at, updated_at, is_deleted)
-        VALUES 
-        ('{free_tier_id}', 'Free', 1000, 'Monthly', NULL, 'Free tier with 1K tokens per month', '{current_time}', '{current_time}', false),
-        ('{pro_tier_id}', 'Pro', 1000000, 'Monthly', NULL, 'Pro tier with 1M tokens per month', '{current_time}', '{current_time}', false),
-        ('{enterprise_tier_id}', 'Enterprise', 10000000, 'Monthly', NULL, 'Enterprise tier with 10M tokens per month', '{current_time}', '{current_time}', false)
-        """
+    subscription_tiers_table = sa.table('subscription_tiers',
+        sa.column('id', sa.UUID()),
+        sa.column('plan_name', sa.String()),
+        sa.column('token_limit', sa.Integer()),
+        sa.column('billing_cycle', sa.String()),
+        sa.column('stripe_price_id', sa.String()),
+        sa.column('description', sa.Text()),
+        sa.column('created_at', sa.DateTime()),
+        sa.column('updated_at', sa.DateTime()),
+        sa.column('is_deleted', sa.Boolean()),
     )
+    default_tiers = [
+        ('Free', 1000, 'Free tier with 1K tokens per month'),
+        ('Pro', 1000000, 'Pro tier with 1M tokens per month'),
+        ('Enterprise', 10000000, 'Enterprise tier with 10M tokens per month'),
+    ]
+    op.bulk_insert(subscription_tiers_table, [
+        {
+            'id': uuid.uuid4(),
+            'plan_name': plan_name,
+            'token_limit': token_limit,
+            'billing_cycle': 'Monthly',
+            'stripe_price_id': None,
+            'description': description,
+            'created_at': current_time,
+            'updated_at': current_time,
+            'is_deleted': False,
+        }
+        for plan_name, token_limit, description in default_tiers
+    ])
 
 
 def downgrade() -> None:
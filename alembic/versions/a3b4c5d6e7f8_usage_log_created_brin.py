@@ -0,0 +1,35 @@
+"""Add a BRIN index on usage_log.created_at
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2025-10-29 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3b4c5d6e7f8'
+down_revision: Union[str, Sequence[str], None] = 'f2a3b4c5d6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Period rollups scan created_at ranges; usage_log is append-only so a BRIN summary
+    # (a few KB) replaces a large btree on the timestamp. Built concurrently so billing
+    # writes aren't blocked
+    with op.get_context().autocommit_block():
+        op.create_index('ix_usage_log_created_brin', 'usage_log', ['created_at'], unique=False,
+                        postgresql_using='brin', postgresql_with={'pages_per_range': 32},
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_usage_log_created_brin', table_name='usage_log',
+                      postgresql_concurrently=True, if_exists=True)
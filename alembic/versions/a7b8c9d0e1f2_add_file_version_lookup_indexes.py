@@ -0,0 +1,34 @@
+"""Add file_versions lookup indexes
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2025-10-27 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, Sequence[str], None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every file read looks up the live current version
+    op.create_index('ix_file_versions_file_current', 'file_versions', ['file_id', 'is_current'],
+                    unique=False, postgresql_where=sa.text('is_deleted = false'))
+    # Version-by-number lookups and the max(version_number) + 1 numbering on insert
+    op.create_index('ix_file_versions_file_version_number', 'file_versions', ['file_id', 'version_number'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_file_versions_file_version_number', table_name='file_versions')
+    op.drop_index('ix_file_versions_file_current', table_name='file_versions')
@@ -0,0 +1,32 @@
+"""Set fillfactor and autovacuum thresholds on the billing tables
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2025-10-29 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4c5d6e7f8a9'
+down_revision: Union[str, Sequence[str], None] = 'a3b4c5d6e7f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # tokens_consumed is bumped on every billed request; free space per page keeps those
+    # updates HOT (no index writes). Applies to pages written from now on
+    op.execute('ALTER TABLE user_subscriptions SET (fillfactor = 70, autovacuum_vacuum_scale_factor = 0.02, autovacuum_analyze_scale_factor = 0.01)')
+    # Append-heavy: vacuum/analyze early so the visibility map stays current for index-only scans
+    op.execute('ALTER TABLE usage_log SET (fillfactor = 90, autovacuum_vacuum_scale_factor = 0.02, autovacuum_analyze_scale_factor = 0.01)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER TABLE usage_log RESET (fillfactor, autovacuum_vacuum_scale_factor, autovacuum_analyze_scale_factor)')
+    op.execute('ALTER TABLE user_subscriptions RESET (fillfactor, autovacuum_vacuum_scale_factor, autovacuum_analyze_scale_factor)')
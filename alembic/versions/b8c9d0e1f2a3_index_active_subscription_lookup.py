@@ -0,0 +1,40 @@
+"""Index the active subscription lookup
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2025-10-28 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, Sequence[str], None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The active subscription query filters on status IN ('ACTIVE', 'LIMIT_REACHED')
+    # and takes the newest row; a status = 'ACTIVE' index could serve neither.
+    # Built concurrently so billing writes aren't blocked (statuses are stored as
+    # the enum names)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_user_subscriptions_user_active_created', 'user_subscriptions',
+                        ['supabase_user_id', 'created_at'], unique=False,
+                        postgresql_where=sa.text("is_deleted = false AND status IN ('ACTIVE', 'LIMIT_REACHED')"),
+                        postgresql_concurrently=True)
+        # Superseded status = 'ACTIVE' index, present only on some databases
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_user_subscriptions_user_active')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_subscriptions_user_active_created', table_name='user_subscriptions',
+                      postgresql_concurrently=True)
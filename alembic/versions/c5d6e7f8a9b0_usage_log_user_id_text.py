@@ -0,0 +1,36 @@
+"""Use TEXT for usage_log.supabase_user_id
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2025-10-29 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d6e7f8a9b0'
+down_revision: Union[str, Sequence[str], None] = 'b4c5d6e7f8a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Unbounded VARCHAR and TEXT are stored identically, so this is a catalog-only
+    # change (no table rewrite or index rebuild)
+    op.alter_column('usage_log', 'supabase_user_id',
+                    existing_type=sa.String(),
+                    type_=sa.Text(),
+                    existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('usage_log', 'supabase_user_id',
+                    existing_type=sa.Text(),
+                    type_=sa.String(),
+                    existing_nullable=False)
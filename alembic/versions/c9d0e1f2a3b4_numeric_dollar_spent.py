@@ -0,0 +1,156 @@
+"""Store user_subscriptions.dollar_spent as NUMERIC(12,3)
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2025-10-28 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, Sequence[str], None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# bill_and_log (f6a7b8c9d0e1) with the cost computation and the dollar_spent
+# increment left open, so upgrade and downgrade can each install their version
+BILL_AND_LOG_SQL = """
+CREATE OR REPLACE FUNCTION bill_and_log(
+    p_user_id text,
+    p_feature featuretype,
+    p_tokens integer,
+    p_prompt_tokens integer DEFAULT NULL,
+    p_completion_tokens integer DEFAULT NULL,
+    p_status varchar DEFAULT NULL,
+    p_latency_ms integer DEFAULT NULL,
+    p_model_used varchar DEFAULT NULL,
+    p_project_id varchar DEFAULT NULL,
+    p_file_id varchar DEFAULT NULL,
+    p_request_id varchar DEFAULT NULL,
+    p_meta_data jsonb DEFAULT NULL
+)
+RETURNS TABLE(logged boolean, allowed boolean, tokens_remaining integer, limit_reached boolean)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_period varchar := to_char(now() AT TIME ZONE 'utc', 'YYYY-MM');
+    v_price double precision;
+    v_cost {cost_type};
+    v_sub user_subscriptions%ROWTYPE;
+    v_prev user_subscriptions%ROWTYPE;
+    v_limit integer;
+BEGIN
+    SELECT tp.usd_per_1k_tokens INTO v_price
+    FROM token_pricing tp
+    WHERE tp.is_deleted = false AND tp.effective_date <= (now() AT TIME ZONE 'utc')
+    ORDER BY tp.effective_date DESC
+    LIMIT 1;
+
+    IF v_price IS NULL THEN
+        RETURN QUERY SELECT false, false, NULL::integer, false;
+        RETURN;
+    END IF;
+
+    v_cost := {cost};
+
+    INSERT INTO usage_log (
+        id, supabase_user_id, feature_used, tokens_used, dollar_cost,
+        prompt_tokens, completion_tokens, status, latency_ms, model_used,
+        project_id, file_id, request_id, meta_data,
+        created_at, updated_at, is_deleted
+    ) VALUES (
+        uuid_generate_v7(), p_user_id, p_feature, p_tokens, v_cost,
+        p_prompt_tokens, p_completion_tokens, p_status, p_latency_ms, coalesce(p_model_used, 'UNKNOWN'),
+        p_project_id, p_file_id, p_request_id, p_meta_data,
+        now(), now(), false
+    );
+
+    SELECT * INTO v_sub
+    FROM user_subscriptions us
+    WHERE us.supabase_user_id = p_user_id AND us.billing_period = v_period AND us.is_deleted = false
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        SELECT * INTO v_prev
+        FROM user_subscriptions us
+        WHERE us.supabase_user_id = p_user_id
+          AND us.status IN ('ACTIVE', 'LIMIT_REACHED')
+          AND us.is_deleted = false
+        ORDER BY us.created_at DESC
+        LIMIT 1;
+
+        INSERT INTO user_subscriptions (
+            id, supabase_user_id, subscription_plan, tokens_consumed, dollar_spent,
+            status, billing_period, start_date, stripe_customer_id, stripe_subscription_id,
+            created_at, updated_at, is_deleted
+        ) VALUES (
+            uuid_generate_v7(), p_user_id, coalesce(v_prev.subscription_plan, 'Free'), 0, 0.0,
+            'ACTIVE', v_period, to_date(v_period || '-01', 'YYYY-MM-DD'),
+            v_prev.stripe_customer_id, v_prev.stripe_subscription_id,
+            now(), now(), false
+        )
+        RETURNING * INTO v_sub;
+    END IF;
+
+    SELECT st.token_limit INTO v_limit
+    FROM subscription_tiers st
+    WHERE st.plan_name = v_sub.subscription_plan AND st.is_deleted = false;
+
+    UPDATE user_subscriptions us
+    SET tokens_consumed = us.tokens_consumed + p_tokens,
+        dollar_spent = {dollar_spent},
+        status = CASE
+            WHEN v_limit IS NOT NULL AND us.tokens_consumed + p_tokens >= v_limit
+                THEN 'LIMIT_REACHED'::subscriptionstatus
+            ELSE us.status
+        END,
+        updated_at = now()
+    WHERE us.id = v_sub.id
+    RETURNING * INTO v_sub;
+
+    RETURN QUERY SELECT
+        true,
+        v_limit IS NOT NULL AND v_sub.status = 'ACTIVE',
+        CASE WHEN v_limit IS NULL THEN NULL ELSE greatest(v_limit - v_sub.tokens_consumed, 0) END,
+        v_sub.status = 'LIMIT_REACHED';
+END;
+$$;
+
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Exact 3-decimal arithmetic in the column, so increments no longer need
+    # round(cast(... AS numeric), 3) on every billed request
+    op.alter_column('user_subscriptions', 'dollar_spent',
+                    existing_type=sa.Float(),
+                    type_=sa.Numeric(12, 3),
+                    existing_nullable=False,
+                    postgresql_using='round(dollar_spent::numeric, 3)')
+    # Add the cost to the column as numeric instead of round-tripping through double precision
+    op.execute(BILL_AND_LOG_SQL.format(
+        cost_type='numeric',
+        cost='round((p_tokens / 1000.0 * v_price)::numeric, 3)',
+        dollar_spent='us.dollar_spent + v_cost',
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(BILL_AND_LOG_SQL.format(
+        cost_type='double precision',
+        cost='round((p_tokens / 1000.0 * v_price)::numeric, 3)::double precision',
+        dollar_spent='round((us.dollar_spent + v_cost)::numeric, 3)::double precision',
+    ))
+    op.alter_column('user_subscriptions', 'dollar_spent',
+                    existing_type=sa.Numeric(12, 3),
+                    type_=sa.Float(),
+                    existing_nullable=False,
+                    postgresql_using='dollar_spent::double precision')
@@ -0,0 +1,37 @@
+"""Store usage_log.meta_data as JSONB
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2025-10-29 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, Sequence[str], None] = 'c9d0e1f2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # meta_data has always held a JSON string; bill_and_log passes it as jsonb
+    op.execute('ALTER TABLE usage_log ALTER COLUMN meta_data TYPE jsonb USING meta_data::jsonb')
+    # Lets analytics filter on metadata keys server-side (created via raw SQL for the GIN opclass).
+    # Built concurrently so billing writes aren't blocked
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usage_log_meta_gin '
+            'ON usage_log USING GIN (meta_data jsonb_path_ops) WHERE is_deleted = false'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_usage_log_meta_gin')
+    op.execute('ALTER TABLE usage_log ALTER COLUMN meta_data TYPE varchar USING meta_data::text')
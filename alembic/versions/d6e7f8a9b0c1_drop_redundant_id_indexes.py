@@ -0,0 +1,46 @@
+"""Drop ix_*_id indexes that duplicate primary keys
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2025-10-29 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6e7f8a9b0c1'
+down_revision: Union[str, Sequence[str], None] = 'c5d6e7f8a9b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The billing and persons tables got a plain btree on id next to the primary key,
+# so every insert maintained two identical indexes
+REDUNDANT_ID_INDEXES = [
+    ('ix_token_pricing_id', 'token_pricing'),
+    ('ix_subscription_tiers_id', 'subscription_tiers'),
+    ('ix_user_subscriptions_id', 'user_subscriptions'),
+    ('ix_usage_log_id', 'usage_log'),
+    ('ix_stripe_webhooks_id', 'stripe_webhooks'),
+    ('ix_persons_id', 'persons'),
+    ('ix_person_details_id', 'person_details'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Dropped concurrently so billing writes aren't blocked
+    with op.get_context().autocommit_block():
+        for index_name, _ in REDUNDANT_ID_INDEXES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for index_name, table_name in REDUNDANT_ID_INDEXES:
+            op.create_index(index_name, table_name, ['id'], unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
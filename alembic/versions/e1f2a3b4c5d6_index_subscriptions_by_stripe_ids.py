@@ -0,0 +1,41 @@
+"""Index user_subscriptions by Stripe ids
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2025-10-29 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f2a3b4c5d6'
+down_revision: Union[str, Sequence[str], None] = 'd0e1f2a3b4c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Webhook handlers look subscriptions up by Stripe ids; most rows have none, so
+    # keep these partial. Built concurrently so billing writes aren't blocked; some
+    # databases already have them
+    with op.get_context().autocommit_block():
+        op.create_index('ix_user_subscriptions_stripe_customer', 'user_subscriptions', ['stripe_customer_id'],
+                        unique=False, postgresql_where=sa.text('stripe_customer_id IS NOT NULL'),
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_user_subscriptions_stripe_subscription', 'user_subscriptions', ['stripe_subscription_id'],
+                        unique=False, postgresql_where=sa.text('stripe_subscription_id IS NOT NULL'),
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_subscriptions_stripe_subscription', table_name='user_subscriptions',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_user_subscriptions_stripe_customer', table_name='user_subscriptions',
+                      postgresql_concurrently=True, if_exists=True)
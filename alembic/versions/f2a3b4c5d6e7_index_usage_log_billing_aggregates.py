@@ -0,0 +1,48 @@
+"""Index usage_log for per-user billing aggregates
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2025-10-29 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a3b4c5d6e7'
+down_revision: Union[str, Sequence[str], None] = 'e1f2a3b4c5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Billing aggregates filter by user + time window on live rows; the INCLUDE
+    # columns let SUM(tokens_used)/SUM(dollar_cost) run as index-only scans.
+    # Both lead with supabase_user_id, which makes the single-column index redundant.
+    # Built concurrently so billing writes aren't blocked
+    with op.get_context().autocommit_block():
+        op.create_index('ix_usage_log_user_created', 'usage_log', ['supabase_user_id', 'created_at'],
+                        unique=False, postgresql_where=sa.text('is_deleted = false'),
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_usage_log_user_feature_created', 'usage_log',
+                        ['supabase_user_id', 'feature_used', 'created_at'],
+                        unique=False, postgresql_where=sa.text('is_deleted = false'),
+                        postgresql_include=['tokens_used', 'dollar_cost'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_usage_log_supabase_user_id', table_name='usage_log',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_usage_log_supabase_user_id', 'usage_log', ['supabase_user_id'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_usage_log_user_feature_created', table_name='usage_log',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_usage_log_user_created', table_name='usage_log',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,154 @@
+"""Add bill_and_log function
+
+Revision ID: f6a7b8c9d0e1
+Revises: e4f5g6h7i8j9
+Create Date: 2025-10-20 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, Sequence[str], None] = 'e4f5g6h7i8j9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Logs one request and charges it to the user's subscription for the current
+# billing period in a single round-trip. Mirrors BillingService.log_usage:
+# price lookup, usage_log insert, subscription get-or-create (carrying over the
+# plan and Stripe ids), usage increment and LIMIT_REACHED flagging.
+BILL_AND_LOG_SQL = """
+-- Time-ordered UUID (version 7), matching app.models.base.uuid7
+CREATE OR REPLACE FUNCTION uuid_generate_v7()
+RETURNS uuid
+LANGUAGE sql
+VOLATILE
+AS $$
+    SELECT encode(
+        set_bit(set_bit(
+            overlay(uuid_send(gen_random_uuid())
+                    PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                    FROM 1 FOR 6),
+            52, 1), 53, 1),
+        'hex')::uuid
+$$;
+
+CREATE OR REPLACE FUNCTION bill_and_log(
+    p_user_id text,
+    p_feature featuretype,
+    p_tokens integer,
+    p_prompt_tokens integer DEFAULT NULL,
+    p_completion_tokens integer DEFAULT NULL,
+    p_status varchar DEFAULT NULL,
+    p_latency_ms integer DEFAULT NULL,
+    p_model_used varchar DEFAULT NULL,
+    p_project_id varchar DEFAULT NULL,
+    p_file_id varchar DEFAULT NULL,
+    p_request_id varchar DEFAULT NULL,
+    p_meta_data jsonb DEFAULT NULL
+)
+RETURNS TABLE(logged boolean, allowed boolean, tokens_remaining integer, limit_reached boolean)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_period varchar := to_char(now() AT TIME ZONE 'utc', 'YYYY-MM');
+    v_price double precision;
+    v_cost double precision;
+    v_sub user_subscriptions%ROWTYPE;
+    v_prev user_subscriptions%ROWTYPE;
+    v_limit integer;
+BEGIN
+    SELECT tp.usd_per_1k_tokens INTO v_price
+    FROM token_pricing tp
+    WHERE tp.is_deleted = false AND tp.effective_date <= (now() AT TIME ZONE 'utc')
+    ORDER BY tp.effective_date DESC
+    LIMIT 1;
+
+    IF v_price IS NULL THEN
+        RETURN QUERY SELECT false, false, NULL::integer, false;
+        RETURN;
+    END IF;
+
+    v_cost := round((p_tokens / 1000.0 * v_price)::numeric, 3)::double precision;
+
+    INSERT INTO usage_log (
+        id, supabase_user_id, feature_used, tokens_used, dollar_cost,
+        prompt_tokens, completion_tokens, status, latency_ms, model_used,
+        project_id, file_id, request_id, meta_data,
+        created_at, updated_at, is_deleted
+    ) VALUES (
+        uuid_generate_v7(), p_user_id, p_feature, p_tokens, v_cost,
+        p_prompt_tokens, p_completion_tokens, p_status, p_latency_ms, coalesce(p_model_used, 'UNKNOWN'),
+        p_project_id, p_file_id, p_request_id, p_meta_data,
+        now(), now(), false
+    );
+
+    SELECT * INTO v_sub
+    FROM user_subscriptions us
+    WHERE us.supabase_user_id = p_user_id AND us.billing_period = v_period AND us.is_deleted = false
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        SELECT * INTO v_prev
+        FROM user_subscriptions us
+        WHERE us.supabase_user_id = p_user_id
+          AND us.status IN ('ACTIVE', 'LIMIT_REACHED')
+          AND us.is_deleted = false
+        ORDER BY us.created_at DESC
+        LIMIT 1;
+
+        INSERT INTO user_subscriptions (
+            id, supabase_user_id, subscription_plan, tokens_consumed, dollar_spent,
+            status, billing_period, start_date, stripe_customer_id, stripe_subscription_id,
+            created_at, updated_at, is_deleted
+        ) VALUES (
+            uuid_generate_v7(), p_user_id, coalesce(v_prev.subscription_plan, 'Free'), 0, 0.0,
+            'ACTIVE', v_period, to_date(v_period || '-01', 'YYYY-MM-DD'),
+            v_prev.stripe_customer_id, v_prev.stripe_subscription_id,
+            now(), now(), false
+        )
+        RETURNING * INTO v_sub;
+    END IF;
+
+    SELECT st.token_limit INTO v_limit
+    FROM subscription_tiers st
+    WHERE st.plan_name = v_sub.subscription_plan AND st.is_deleted = false;
+
+    UPDATE user_subscriptions us
+    SET tokens_consumed = us.tokens_consumed + p_tokens,
+        dollar_spent = round((us.dollar_spent + v_cost)::numeric, 3)::double precision,
+        status = CASE
+            WHEN v_limit IS NOT NULL AND us.tokens_consumed + p_tokens >= v_limit
+                THEN 'LIMIT_REACHED'::subscriptionstatus
+            ELSE us.status
+        END,
+        updated_at = now()
+    WHERE us.id = v_sub.id
+    RETURNING * INTO v_sub;
+
+    RETURN QUERY SELECT
+        true,
+        v_limit IS NOT NULL AND v_sub.status = 'ACTIVE',
+        CASE WHEN v_limit IS NULL THEN NULL ELSE greatest(v_limit - v_sub.tokens_consumed, 0) END,
+        v_sub.status = 'LIMIT_REACHED';
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(BILL_AND_LOG_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        'DROP FUNCTION IF EXISTS bill_and_log(text, featuretype, integer, integer, integer, '
+        'varchar, integer, varchar, varchar, varchar, varchar, jsonb)'
+    )
+    op.execute('DROP FUNCTION IF EXISTS uuid_generate_v7()')
@@ -1,83 +1,232 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from typing import Optional
+from typing import Any, Dict, Optional, Set
+from cachetools import TTLCache
+import asyncio
+import hashlib
+import logging
+import time
+import httpx
 from app.services.supabase_service import supabase_service
 from app.schemas.auth import TokenData
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 security = HTTPBearer()
 
+# Supabase signing keys by `kid`, loaded at startup and refreshed on a `kid` miss
+_jwks_cache: Dict[str, Any] = {}
+_jwks_lock = asyncio.Lock()
+# A `kid` miss refetches the JWKS at most this often, so tokens with made-up
+# `kid`s can't turn every request into a fetch
+_JWKS_REFRESH_INTERVAL = 60
+_jwks_refreshed_at = 0.0
+
+# Asymmetric algorithms Supabase signs with; never taken from the token header
+_JWKS_ALGORITHMS = ["RS256", "ES256"]
+# Secrets that must never verify a token (unset, or a published placeholder)
+_UNUSABLE_SECRETS = {"", "your-secret-key-change-this", "your-jwt-secret-key-change-this"}
+
+# Users resolved through the Supabase fallback, keyed by token hash
+_supabase_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+# Recently verified tokens, so keep-alive clients skip the signature check
+_VERIFIED_TOKEN_TTL = 30
+_verified_token_cache: TTLCache = TTLCache(maxsize=50_000, ttl=_VERIFIED_TOKEN_TTL)
+
+# Tokens Supabase rejected during a background revocation check
+_revoked_tokens: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+
+# Strong references to in-flight background checks (the loop only keeps weak ones)
+_background_checks: Set[asyncio.Task] = set()
+
+# Shared 401 for every rejected token; it carries no per-request state
+_CREDENTIALS_EXC = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def _token_key(token: str) -> bytes:
+    """Short digest of a bearer token, used as a cache key"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _jwks_url() -> str:
+    return f"{settings.supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json"
+
+
+class _NoLocalKey(Exception):
+    """The token can't be checked locally; it has to be verified by Supabase"""
+
+
+async def load_jwks() -> None:
+    """Fetch the Supabase JWKS and replace the local key cache"""
+    global _jwks_refreshed_at
+    _jwks_refreshed_at = time.monotonic()
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        response = await client.get(_jwks_url(), headers={"apikey": settings.supabase_key})
+        response.raise_for_status()
+        keys = response.json().get("keys", [])
+    _jwks_cache.clear()
+    _jwks_cache.update({key["kid"]: key for key in keys if "kid" in key})
+
+
+async def _get_signing_key(kid: str) -> Optional[Dict[str, Any]]:
+    """Return the JWK for `kid`, refreshing the cache on a miss at most once per interval"""
+    key = _jwks_cache.get(kid)
+    if key is not None:
+        return key
+    async with _jwks_lock:
+        # Another request may have refreshed the keys while we waited
+        key = _jwks_cache.get(kid)
+        if key is None:
+            if time.monotonic() - _jwks_refreshed_at >= _JWKS_REFRESH_INTERVAL:
+                await load_jwks()
+                key = _jwks_cache.get(kid)
+            elif not _jwks_cache:
+                # No keys at all (the last fetch failed): this is an outage, not a bad kid
+                raise _NoLocalKey("Supabase JWKS unavailable")
+    return key
+
+
+async def _decode_locally(token: str) -> Dict[str, Any]:
+    """Verify the token signature and claims without calling Supabase"""
+    header = jwt.get_unverified_header(token)
+
+    if header.get("alg") == "HS256":
+        # Legacy Supabase projects sign access tokens with the project JWT secret.
+        # Without it configured, Supabase has to vouch for the token
+        secret = settings.supabase_jwt_secret
+        if secret in _UNUSABLE_SECRETS:
+            raise _NoLocalKey("SUPABASE_JWT_SECRET not configured")
+        return jwt.decode(
+            token,
+            secret,
+            algorithms=["HS256"],
+            audience=settings.supabase_jwt_audience,
+        )
+
+    kid = header.get("kid")
+    key = await _get_signing_key(kid) if kid else None
+    if key is None:
+        raise JWTError(f"Unknown signing key: {kid}")
+
+    # The allowed algorithms are fixed; the header only picks the key
+    return jwt.decode(
+        token,
+        key,
+        algorithms=_JWKS_ALGORITHMS,
+        audience=settings.supabase_jwt_audience,
+    )
+
+
+async def _get_user_from_supabase(token: str) -> Optional[TokenData]:
+    """Resolve a token through Supabase, caching the answer briefly"""
+    cache_key = _token_key(token)
+    cached = _supabase_user_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    user_result = await asyncio.wait_for(
+        supabase_service.get_user(token),
+        timeout=3.0
+    )
+    if not (user_result["success"] and user_result.get("user")):
+        return None
+
+    user = user_result["user"]
+    token_data = TokenData(user_id=user.id, email=user.email)
+    _supabase_user_cache[cache_key] = token_data
+    return token_data
+
+
+async def _refresh_user_cache(token: str) -> None:
+    """Ask Supabase about a locally verified token and remember revocations"""
+    token_key = _token_key(token)
+    try:
+        user_result = await supabase_service.get_user(token)
+    except Exception as supabase_error:
+        logger.debug(f"Background Supabase check failed: {supabase_error}")
+        return
+
+    if user_result["success"] and user_result.get("user"):
+        user = user_result["user"]
+        _supabase_user_cache[token_key] = TokenData(user_id=user.id, email=user.email)
+    elif user_result.get("status") in (401, 403):
+        # Only an explicit rejection counts; an unreachable Supabase says nothing about the token
+        _revoked_tokens[token_key] = True
+        _verified_token_cache.pop(token_key, None)
+
+
+def _schedule_revocation_check(token: str) -> None:
+    """Check the token with Supabase off the request path, at most once per cache window"""
+    if _token_key(token) in _supabase_user_cache:
+        return
+    task = asyncio.create_task(_refresh_user_cache(token))
+    _background_checks.add(task)
+    task.add_done_callback(_background_checks.discard)
+
+
 async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
     """Verify JWT token and return user data"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
+    token = credentials.credentials
+    token_key = _token_key(token)
+
+    if token_key in _revoked_tokens:
+        raise _CREDENTIALS_EXC.with_traceback(None)
+
+    cached = _verified_token_cache.get(token_key)
+    if cached is not None:
+        return cached
+
+    # Verify the signature locally against the cached JWKS (no network call)
+    try:
+        payload = await _decode_locally(token)
+    except JWTError as decode_error:
+        logger.debug(f"Local JWT verification failed: {decode_error}")
+        raise _CREDENTIALS_EXC.with_traceback(None)
+    except httpx.HTTPError as jwks_error:
+        # Without signing keys the local check can't decide; only then ask Supabase inline
+        logger.warning(f"Could not load Supabase JWKS, trying Supabase: {jwks_error}")
+        return await _verify_with_supabase(token)
+    except _NoLocalKey as no_key:
+        logger.debug(f"Verifying token with Supabase: {no_key}")
+        return await _verify_with_supabase(token)
+
+    user_id = payload.get("sub")
+    if not user_id:
+        raise _CREDENTIALS_EXC.with_traceback(None)
+
+    token_data = TokenData(user_id=user_id, email=payload.get("email", ""))
+    # Don't let the cache outlive the token itself
+    if payload.get("exp", 0) - time.time() > _VERIFIED_TOKEN_TTL:
+        _verified_token_cache[token_key] = token_data
+    # Revocation is picked up asynchronously; the next request sees the result
+    _schedule_revocation_check(token)
+    return token_data
+
+
+async def _verify_with_supabase(token: str) -> TokenData:
+    """Resolve the token through Supabase on the request path (JWKS outage only)"""
     try:
-        token = credentials.credentials
-        user_id = None
-        email = None
-        
-        # First, try to decode JWT locally (fast, no network call)
-        # This is less secure but much faster for debugging
-        try:
-            # Decode without verification to get user info quickly
-            # In production, you should verify the signature
-            payload = jwt.decode(
-                token,
-                options={"verify_signature": False}  # Skip verification for speed
-            )
-            user_id = payload.get("sub")
-            email = payload.get("email")
-            
-            if user_id:
-                print(f"✅ Fast JWT decode successful for user: {user_id}")
-                return TokenData(
-                    user_id=user_id,
-                    email=email or ""
-                )
-        except Exception as decode_error:
-            print(f"⚠️ JWT decode failed, trying Supabase: {decode_error}")
-        
-        # Fallback: Try to get user from Supabase (slower but more secure)
-        import asyncio
-        try:
-            user_result = await asyncio.wait_for(
-                supabase_service.get_user(token),
-                timeout=3.0  # Reduced to 3 seconds
-            )
-            
-            if user_result["success"] and user_result.get("user"):
-                user = user_result["user"]
-                return TokenData(
-                    user_id=user.id,
-                    email=user.email
-                )
-        except asyncio.TimeoutError:
-            print("⚠️ Supabase auth timeout, using JWT decode result")
-            # If Supabase times out but JWT decode worked, use that
-            if user_id:
-                return TokenData(user_id=user_id, email=email or "")
-            raise HTTPException(
-                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                detail="Authentication service timeout"
-            )
-        except Exception as supabase_error:
-            print(f"⚠️ Supabase auth error: {supabase_error}")
-            # If JWT decode worked, use that as fallback
-            if user_id:
-                return TokenData(user_id=user_id, email=email or "")
-        
-        raise credentials_exception
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ Auth error: {e}")
-        raise credentials_exception
+        token_data = await _get_user_from_supabase(token)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Authentication service timeout"
+        )
+    except Exception as supabase_error:
+        logger.warning(f"Supabase auth error: {supabase_error}")
+        token_data = None
+
+    if token_data is None:
+        # Drop the previous raise's traceback so the shared instance doesn't pin old frames
+        raise _CREDENTIALS_EXC.with_traceback(None)
+    return token_data
 
 async def get_current_user(token_data: TokenData = Depends(verify_token)) -> TokenData:
     """Get current authenticated user"""
@@ -86,4 +235,4 @@ async def get_current_user(token_data: TokenData = Depends(verify_token)) -> Tok
 async def get_current_active_user(current_user: TokenData = Depends(get_current_user)) -> TokenData:
     """Get current active user (can add additional checks here)"""
     # You can add additional user validation here
-    return current_user 
\ No newline at end of file
+    return current_user
@@ -1,14 +1,31 @@
+import logging
 from functools import wraps
 from typing import Callable, Any, Optional
 from fastapi import HTTPException, status
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.billing_service import billing_service
+from app.core.usage_buffer import usage_buffer
 from app.models.usage_log import FeatureType
 
+logger = logging.getLogger(__name__)
+
+# Happy-path limit check in one query. Kept as a constant so the SQL text is
+# identical on every call and asyncpg reuses its prepared statement.
+_ACTIVE_SUBSCRIPTION_USAGE = text(
+    "SELECT us.status, us.tokens_consumed, st.token_limit "
+    "FROM user_subscriptions us "
+    "JOIN subscription_tiers st ON st.plan_name = us.subscription_plan AND st.is_deleted = false "
+    "WHERE us.supabase_user_id = :user_id AND us.billing_period = :billing_period "
+    "AND us.is_deleted = false"
+)
+
 
 class BillingCheckResult:
     """Result of a billing check"""
+    __slots__ = ("allowed", "message", "tokens_remaining")
+    
     def __init__(self, allowed: bool, message: str, tokens_remaining: Optional[int] = None):
         self.allowed = allowed
         self.message = message
@@ -25,15 +42,30 @@ async def check_billing_limit(
     Check if user has sufficient tokens for the request.
     Raises HTTPException if limit is reached.
     """
+    row = (await db.execute(
+        _ACTIVE_SUBSCRIPTION_USAGE,
+        {"user_id": user_id, "billing_period": billing_service.get_current_billing_period()}
+    )).first()
+    if row is not None and row.status == "ACTIVE":
+        return BillingCheckResult(
+            allowed=True,
+            message="Request allowed",
+            tokens_remaining=row.token_limit - row.tokens_consumed
+        )
+    
+    # New billing period, missing tier or a blocked subscription: take the full path,
+    # which creates the period's subscription and explains refusals.
+    # Callers only need the subscription/tier payload when the request is refused
     result = await billing_service.check_subscription_limit(
         db, 
         user_id, 
         feature_type, 
-        estimated_tokens
+        estimated_tokens,
+        include_details=False
     )
     
     if not result.allowed:
-        print("Subscription limit reached")
+        logger.debug(f"Subscription limit reached for user {user_id}")
         raise HTTPException(
             status_code=status.HTTP_402_PAYMENT_REQUIRED,
             detail={
@@ -71,8 +103,34 @@ async def log_billing_usage(
     """
     Log token usage for a completed request.
     Returns usage log result.
+    
+    Both paths bill through the bill_and_log database function. While the
+    usage buffer is running it is called by the buffer's background flusher,
+    so `limit_reached` is only known after the next limit check; otherwise
+    (no buffer started, e.g. scripts) it is called inline.
     """
-    result = await billing_service.log_usage(
+    if usage_buffer.is_running:
+        usage_buffer.add({
+            "user_id": user_id,
+            "feature_type": feature_type,
+            "tokens_used": tokens_used,
+            "request_id": request_id,
+            "meta_data": meta_data,
+            "latency_ms": latency_ms,
+            "model_used": model_used,
+            "project_id": project_id,
+            "file_id": file_id,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "status": status
+        })
+        return {
+            "success": True,
+            "limit_reached": False,
+            "tokens_remaining": None
+        }
+    
+    result = await billing_service.bill_and_log(
         db,
         user_id,
         feature_type,
@@ -89,9 +147,9 @@ async def log_billing_usage(
     )
     
     return {
-        "success": result.success,
-        "limit_reached": result.limit_reached,
-        "tokens_remaining": None  # This info is available via billing stats endpoint
+        "success": result["logged"],
+        "limit_reached": result["limit_reached"],
+        "tokens_remaining": result["tokens_remaining"]
     }
 
 
@@ -1,34 +1,53 @@
 from pydantic_settings import BaseSettings
 from typing import Optional
-import os
+from functools import lru_cache
 
 
 class Settings(BaseSettings):
     # Environment configuration
-    environment: str = os.getenv("ENVIRONMENT", "development")
+    environment: str = "development"
     
     # Supabase configuration
-    supabase_url: str = os.getenv("SUPABASE_URL", "")
-    supabase_key: str = os.getenv("SUPABASE_KEY", "")
+    supabase_url: str = ""
+    supabase_key: str = ""
+    supabase_jwt_audience: str = "authenticated"
+    # Supabase project JWT secret, only for projects still signing access tokens
+    # with HS256; leave empty to verify those tokens through Supabase instead
+    supabase_jwt_secret: str = ""
     
     # Database configuration (for SQLAlchemy - connects to Supabase PostgreSQL)
-    database_url: Optional[str] = os.getenv("DATABASE_URL", "")
-    database_echo: bool = os.getenv("DATABASE_ECHO", "false").lower() == "true"
+    database_url: Optional[str] = ""
+    database_echo: bool = False
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_timeout: int = 5
+    db_pool_recycle: int = 1800
+    # Set when database_url points at PgBouncer in transaction mode, which can't
+    # keep asyncpg's per-connection prepared statements (set jit off on the
+    # database role then: ALTER ROLE <role> SET jit = off)
+    db_pgbouncer: bool = False
     
     # Frontend URL (for CORS and password reset redirects)
-    frontend_url: str = os.getenv("FRONTEND_URL", "http://localhost:5173")
+    frontend_url: str = "http://localhost:5173"
     
     # JWT configuration (used by Supabase)
-    jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this")
+    jwt_secret_key: str = "your-secret-key-change-this"
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 30
     
     # Voice processing configuration
-    voice_upload_folder: str = os.getenv("VOICE_UPLOAD_FOLDER", "./uploads/voices")
-    tts_model: str = os.getenv("TTS_MODEL", "tts_models/multilingual/multi-dataset/xtts_v2")
+    voice_upload_folder: str = "./uploads/voices"
+    tts_model: str = "tts_models/multilingual/multi-dataset/xtts_v2"
     
+    # Values come from the environment (or .env) by field name, e.g. DATABASE_URL
     class Config:
         env_file = ".env"
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide Settings, parsing the environment only once"""
+    return Settings()
+
+
+settings = get_settings()
@@ -0,0 +1,51 @@
+"""
+In-process cache for CRUDBase.get() lookups.
+
+Models opt in with `__crud_cache__ = True`. Entries hold a snapshot of the
+row's column values rather than the ORM object, so no instance is shared
+between sessions; a hit is rebuilt and merged into the caller's session
+without touching the database.
+"""
+
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+
+def snapshot(obj: Any, columns: Iterable[str]) -> Dict[str, Any]:
+    """Column values of a loaded instance, safe to keep across sessions"""
+    return {key: getattr(obj, key) for key in columns}
+
+
+async def attach(db: AsyncSession, model: Any, values: Dict[str, Any]) -> Any:
+    """Rebuild an instance from a snapshot and attach it to db without a query"""
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return await db.merge(obj, load=False)
+
+
+class CrudCache:
+    """Column-value snapshots keyed by (model name, id), invalidated on writes"""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 30):
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        return self._entries.get(key)
+
+    def set(self, key: Hashable, values: Dict[str, Any]) -> None:
+        self._entries[key] = values
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def invalidate_model(self, model_name: str) -> None:
+        """Drop every entry of one model (for writes that don't know their ids)"""
+        for key in [key for key in self._entries.keys() if key[0] == model_name]:
+            self._entries.pop(key, None)
+
+
+# Global cache instance
+crud_cache = CrudCache()
@@ -1,7 +1,36 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from .config import settings
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Optional
+from uuid import uuid4
+import asyncio
+import orjson
+
+
+def _json_serializer(value: Any) -> str:
+    # SQLAlchemy expects str from the JSON serializer; orjson returns bytes
+    return orjson.dumps(value).decode()
+
+
+def _connect_args() -> dict:
+    if settings.db_pgbouncer:
+        # PgBouncer in transaction mode may hand each statement another backend:
+        # no statement caches, unique names for the statements asyncpg still
+        # prepares, and no startup parameters (PgBouncer rejects unknown ones;
+        # set jit with ALTER ROLE <role> SET jit = off instead)
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        # Short OLTP queries don't benefit from JIT; it only adds planning latency
+        "server_settings": {"jit": "off"},
+        # Keep parsed plans for the repeated auth/billing queries on each connection
+        "statement_cache_size": 1024,
+        "prepared_statement_cache_size": 256,
+    }
+
 
 # Create async engine (only if database_url is provided)
 engine: Optional[object] = None
@@ -9,8 +38,17 @@ if settings.database_url:
     engine = create_async_engine(
         settings.database_url,
         echo=settings.database_echo,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
         pool_pre_ping=True,
-        pool_recycle=300,
+        # Room for every CRUD statement shape (default 500) so compiled SQL stays cached
+        query_cache_size=1200,
+        # JSONB columns (usage_log.meta_data) are (de)serialized on every write/read
+        json_serializer=_json_serializer,
+        json_deserializer=orjson.loads,
+        connect_args=_connect_args(),
     )
 
 # Create async session factory (only if engine exists)
@@ -35,6 +73,21 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+async def warm_up_pool() -> None:
+    """Open db_pool_size connections concurrently so early requests don't pay connect/TLS/startup"""
+    if not engine:
+        return
+    conns = await asyncio.gather(
+        *(engine.connect() for _ in range(settings.db_pool_size)), return_exceptions=True
+    )
+    # Closing returns each connection to the pool, open
+    errors = [conn for conn in conns if isinstance(conn, BaseException)]
+    for conn in conns:
+        if not isinstance(conn, BaseException):
+            await conn.close()
+    if errors:
+        raise errors[0]
+
 async def init_db():
     """Initialize database tables"""
     if not engine:
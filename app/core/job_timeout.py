@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+import threading
 import time
 from datetime import datetime, timezone
 
+import numpy as np
+
+# Bound once; the timeout checks run on every status poll
+_monotonic = time.monotonic
+
 
 @dataclass
 class JobTimeoutEntry:
@@ -12,72 +18,142 @@ class JobTimeoutEntry:
     job_id: str
     timeout_seconds: int
     started_monotonic: float
-    started_at: datetime
+    started_epoch: float
     # Optional traceability context
     project_id: Optional[str] = None
     file_id: Optional[str] = None
 
+    @property
+    def started_at(self) -> datetime:
+        return datetime.fromtimestamp(self.started_epoch, tz=timezone.utc)
+
 
 class JobTimeoutRegistry:
     """Simple in-memory registry for tracking per-job total timeout budgets.
 
+    Start times and budgets live in parallel NumPy arrays (one slot per job) so
+    a sweep over every job for timeouts is a single vectorized compare; the
+    rarely read fields sit in a parallel list. Removing a job moves another
+    job into its slot, so every slot access holds the lock.
+
     Note: This is per-process memory only. If you run multiple workers/processes,
     each will track its own registry.
     """
 
-    def __init__(self) -> None:
-        self._entries: Dict[Tuple[str, str], JobTimeoutEntry] = {}
+    _INITIAL_CAPACITY = 64
 
-    def register_job(self, category: str, job_id: str, timeout_seconds: int, *, project_id: Optional[str] = None, file_id: Optional[str] = None) -> None:
-        key = (category, job_id)
-        if key in self._entries:
-            return
-        self._entries[key] = JobTimeoutEntry(
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._index: Dict[Tuple[str, str], int] = {}
+        self._keys: List[Tuple[str, str]] = []
+        self._started = np.empty(self._INITIAL_CAPACITY, dtype=np.float64)
+        self._timeout = np.empty(self._INITIAL_CAPACITY, dtype=np.int32)
+        # (started_epoch, project_id, file_id) per slot
+        self._cold: List[Tuple[float, Optional[str], Optional[str]]] = []
+
+    def _grow(self) -> None:
+        capacity = len(self._started) * 2
+        self._started = np.resize(self._started, capacity)
+        self._timeout = np.resize(self._timeout, capacity)
+
+    def _entry_at(self, idx: int) -> JobTimeoutEntry:
+        category, job_id = self._keys[idx]
+        started_epoch, project_id, file_id = self._cold[idx]
+        return JobTimeoutEntry(
             category=category,
             job_id=job_id,
-            timeout_seconds=int(timeout_seconds),
-            started_monotonic=time.monotonic(),
-            started_at=datetime.now(timezone.utc),
+            timeout_seconds=int(self._timeout[idx]),
+            started_monotonic=float(self._started[idx]),
+            started_epoch=started_epoch,
             project_id=project_id,
             file_id=file_id,
         )
 
+    def register_job(self, category: str, job_id: str, timeout_seconds: int, *, project_id: Optional[str] = None, file_id: Optional[str] = None) -> None:
+        key = (category, job_id)
+        with self._lock:
+            if key in self._index:
+                return
+            idx = len(self._keys)
+            if idx == len(self._started):
+                self._grow()
+            self._started[idx] = _monotonic()
+            self._timeout[idx] = int(timeout_seconds)
+            self._keys.append(key)
+            self._cold.append((time.time(), project_id, file_id))
+            self._index[key] = idx
+
     def get_entry(self, category: str, job_id: str) -> Optional[JobTimeoutEntry]:
-        return self._entries.get((category, job_id))
+        with self._lock:
+            idx = self._index.get((category, job_id))
+            if idx is None:
+                return None
+            return self._entry_at(idx)
 
     def seconds_elapsed(self, category: str, job_id: str) -> Optional[float]:
-        entry = self.get_entry(category, job_id)
-        if not entry:
-            return None
-        return max(0.0, time.monotonic() - entry.started_monotonic)
+        with self._lock:
+            idx = self._index.get((category, job_id))
+            if idx is None:
+                return None
+            started = float(self._started[idx])
+        return max(0.0, _monotonic() - started)
     
     def get_latency_ms(self, category: str, job_id: str) -> Optional[int]:
         """Get latency in milliseconds for a job"""
-        elapsed_sec = self.seconds_elapsed(category, job_id)
-        if elapsed_sec is None:
-            return None
-        return int(elapsed_sec * 1000)
+        with self._lock:
+            idx = self._index.get((category, job_id))
+            if idx is None:
+                return None
+            started = float(self._started[idx])
+        return int(max(0.0, _monotonic() - started) * 1000)
 
     def is_timed_out(self, category: str, job_id: str) -> bool:
-        entry = self.get_entry(category, job_id)
-        if not entry:
-            return False
-        elapsed = time.monotonic() - entry.started_monotonic
-        return elapsed >= entry.timeout_seconds
+        with self._lock:
+            idx = self._index.get((category, job_id))
+            if idx is None:
+                return False
+            return bool(self._timeout[idx] <= _monotonic() - self._started[idx])
+
+    def expired_ids(self) -> List[Tuple[str, str]]:
+        """(category, job_id) of every registered job that is past its budget"""
+        with self._lock:
+            count = len(self._keys)
+            if count == 0:
+                return []
+            mask = (_monotonic() - self._started[:count]) >= self._timeout[:count]
+            return [self._keys[i] for i in np.flatnonzero(mask)]
+
+    def snapshot(self) -> List[Tuple[Tuple[str, str], JobTimeoutEntry]]:
+        """Consistent copy of all entries, safe to iterate while jobs come and go"""
+        with self._lock:
+            return [(key, self._entry_at(idx)) for idx, key in enumerate(self._keys)]
 
     def remove_job(self, category: str, job_id: str) -> bool:
         """Remove a job from the timeout registry (e.g., when completed)"""
-        key = (category, job_id)
-        if key in self._entries:
-            del self._entries[key]
+        with self._lock:
+            idx = self._index.pop((category, job_id), None)
+            if idx is None:
+                return False
+            # Move the last slot into the hole so the arrays stay dense
+            last = len(self._keys) - 1
+            if idx != last:
+                last_key = self._keys[last]
+                self._keys[idx] = last_key
+                self._cold[idx] = self._cold[last]
+                self._started[idx] = self._started[last]
+                self._timeout[idx] = self._timeout[last]
+                self._index[last_key] = idx
+            self._keys.pop()
+            self._cold.pop()
             return True
-        return False
 
     def get_project_and_file(self, category: str, job_id: str) -> tuple[Optional[str], Optional[str]]:
-        entry = self.get_entry(category, job_id)
-        if not entry:
-            return None, None
-        return entry.project_id, entry.file_id
+        with self._lock:
+            idx = self._index.get((category, job_id))
+            if idx is None:
+                return None, None
+            _, project_id, file_id = self._cold[idx]
+        return project_id, file_id
 
 
 job_timeout_registry = JobTimeoutRegistry()
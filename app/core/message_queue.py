@@ -7,29 +7,125 @@ to the database without blocking WebSocket responses.
 
 import asyncio
 import logging
-from typing import Dict, Optional, Any
+import os
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime
 from uuid import UUID
-from dataclasses import dataclass
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal
 from app.crud.message import message_crud
-from app.schemas.message import MessageCreate
 from app.models.message import MessageRole
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Bound once; the queue helpers run on every WebSocket message
+_ROLE_USER = MessageRole.USER
+_ROLE_ASSISTANT = MessageRole.ASSISTANT
+_log_debug = logger.debug
+
 class QueuedMessage:
     """Represents a message waiting to be saved to the database"""
-    conversation_id: UUID
-    role: MessageRole
-    content: str
-    user_id: UUID
-    model_used: Optional[str] = None
-    created_at: Optional[datetime] = None
-    retry_count: int = 0
+    __slots__ = ("conversation_id", "role", "content", "user_id", "model_used", "created_at", "retry_count")
+    
+    def __init__(
+        self,
+        conversation_id: bytes,
+        role: MessageRole,
+        content: str,
+        user_id: bytes,
+        model_used: Optional[str] = None,
+        created_at: Optional[float] = None,
+        retry_count: int = 0
+    ):
+        self.conversation_id = conversation_id
+        self.role = role
+        self.content = content
+        self.user_id = user_id
+        self.model_used = model_used
+        self.created_at = created_at
+        self.retry_count = retry_count
+
+# Free list of QueuedMessage objects, reused once their message is saved
+_POOL: List[QueuedMessage] = []
+_POOL_MAX = 1024
+
+def _acquire(
+    conversation_id: bytes,
+    role: MessageRole,
+    content: str,
+    user_id: bytes,
+    model_used: Optional[str],
+    created_at: Optional[float]
+) -> QueuedMessage:
+    """Take a QueuedMessage from the pool (or allocate one) and fill it in"""
+    if not _POOL:
+        return QueuedMessage(conversation_id, role, content, user_id, model_used, created_at)
+    message = _POOL.pop()
+    message.conversation_id = conversation_id
+    message.role = role
+    message.content = content
+    message.user_id = user_id
+    message.model_used = model_used
+    message.created_at = created_at
+    message.retry_count = 0
+    return message
+
+def _release(message: QueuedMessage) -> None:
+    """Return a finished QueuedMessage to the pool, dropping its payload"""
+    if len(_POOL) < _POOL_MAX:
+        message.content = None
+        message.model_used = None
+        _POOL.append(message)
+
+def _row(message: QueuedMessage) -> Dict[str, Any]:
+    """Column values for inserting a queued message (created_at preserved for ordering)"""
+    return {
+        "conversation_id": UUID(bytes=message.conversation_id),
+        "role": message.role,
+        "content": message.content,
+        "model_used": message.model_used,
+        "created_at": datetime.utcfromtimestamp(message.created_at),
+    }
+
+class _SessionLost(Exception):
+    """The worker's session can't be rolled back (dead connection); carries the unsaved messages"""
+    
+    def __init__(self, unsaved: List[QueuedMessage]):
+        super().__init__(f"{len(unsaved)} messages unsaved")
+        self.unsaved = unsaved
+
+async def _rollback(db: AsyncSession) -> bool:
+    """Roll back, reporting instead of raising if the connection is gone"""
+    try:
+        await db.rollback()
+        return True
+    except Exception as e:
+        logger.error(f"❌ Message queue rollback failed: {str(e)}")
+        return False
+
+async def _discard(db: AsyncSession) -> None:
+    """Close a session whose connection may already be dead"""
+    try:
+        await db.close()
+    except Exception as e:
+        logger.debug("Closing message queue session failed: %s", e)
+
+class _QueueStats:
+    """Monitoring counters (plain attributes, bumped on every message)"""
+    __slots__ = ("messages_queued", "messages_saved", "messages_failed", "messages_dropped")
+    
+    def __init__(self):
+        self.messages_queued = 0
+        self.messages_saved = 0
+        self.messages_failed = 0
+        self.messages_dropped = 0
+    
+    def as_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
 
 class MessageQueue:
     """
@@ -37,145 +133,246 @@ class MessageQueue:
     
     Provides fast, non-blocking message queuing with background processing
     and automatic retry logic for failed database writes.
+    
+    Messages are sharded by conversation across several workers, so writes
+    for different conversations run concurrently while each conversation's
+    messages are still saved in order by a single worker.
     """
     
-    def __init__(self, max_retries: int = 3, batch_size: int = 10):
-        self.queue: asyncio.Queue[QueuedMessage] = asyncio.Queue()
+    def __init__(
+        self,
+        max_retries: int = 3,
+        batch_size: int = 10,
+        max_queue_size: int = 50_000,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 30.0,
+        num_workers: Optional[int] = None,
+        shutdown_timeout: float = 5.0
+    ):
+        self.num_workers = num_workers or max(2, (os.cpu_count() or 2) // 2)
+        # One deque and wake-up event per worker; each shard has a single
+        # consumer, so producers append without going through the scheduler
+        self._shards: List[deque[QueuedMessage]] = [deque() for _ in range(self.num_workers)]
+        self._wakes: List[asyncio.Event] = [asyncio.Event() for _ in range(self.num_workers)]
+        self._pending = 0
+        # Backoff timers of messages waiting to be retried, by id(message)
+        self._retry_timers: Dict[int, Tuple[asyncio.TimerHandle, QueuedMessage]] = {}
+        self.max_queue_size = max_queue_size
         self.max_retries = max_retries
         self.batch_size = batch_size
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.shutdown_timeout = shutdown_timeout
         self.is_running = False
-        self.worker_task: Optional[asyncio.Task] = None
+        self.worker_tasks: List[asyncio.Task] = []
         
         # Stats for monitoring
-        self.stats = {
-            "messages_queued": 0,
-            "messages_saved": 0,
-            "messages_failed": 0,
-            "queue_size": 0
-        }
+        self.stats = _QueueStats()
     
     async def start(self):
-        """Start the background worker"""
+        """Start the background workers"""
         if not self.is_running:
             self.is_running = True
-            self.worker_task = asyncio.create_task(self._worker())
-            logger.info("🚀 Message queue worker started")
+            self.worker_tasks = [asyncio.create_task(self._worker(shard)) for shard in range(self.num_workers)]
+            logger.info("🚀 Message queue started with %d workers", self.num_workers)
     
     async def stop(self):
-        """Stop the background worker and process remaining messages"""
+        """Stop the background workers, giving them shutdown_timeout seconds to drain"""
         if self.is_running:
             self.is_running = False
-            if self.worker_task:
-                await self.worker_task
-            
-            # Process any remaining messages
-            await self._process_remaining_messages()
+            if self.worker_tasks:
+                # Retries still backing off would fire after the workers are gone;
+                # queue them now so they are drained with everything else
+                for handle, message in list(self._retry_timers.values()):
+                    handle.cancel()
+                    self._requeue(message)
+                self._retry_timers.clear()
+                # Wake the workers; each exits once its shard is saved
+                for wake in self._wakes:
+                    wake.set()
+                _, pending = await asyncio.wait(self.worker_tasks, timeout=self.shutdown_timeout)
+                if pending:
+                    logger.error(f"💀 Message queue did not drain in {self.shutdown_timeout}s, abandoning {self._pending} messages")
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                self.worker_tasks = []
             logger.info("🛑 Message queue worker stopped")
     
-    async def add_message(
+    def add_message(
         self, 
-        conversation_id: UUID,
+        conversation_id: Union[UUID, bytes],
         role: MessageRole,
         content: str,
-        user_id: UUID,
+        user_id: Union[UUID, bytes],
         model_used: Optional[str] = None,
-        created_at: Optional[datetime] = None
+        created_at: Optional[float] = None
     ) -> None:
         """
         Add a message to the queue for async persistence.
         
-        This method is non-blocking and returns immediately.
+        This method is non-blocking and returns immediately. If the queue is
+        full (the database has fallen far behind) the message is dropped.
+        created_at is Unix epoch seconds (defaults to now); the datetime for
+        the row is built by the worker.
         """
-        message = QueuedMessage(
-            conversation_id=conversation_id,
-            role=role,
-            content=content,
-            user_id=user_id,
-            model_used=model_used,
-            created_at=created_at or datetime.utcnow()
-        )
+        # Shed load rather than grow without bound while the database is stalled
+        if self._pending >= self.max_queue_size:
+            self.stats.messages_dropped += 1
+            logger.error(f"💀 Message queue full, dropped {role.value} message for conversation {conversation_id}")
+            return
         
-        await self.queue.put(message)
-        self.stats["messages_queued"] += 1
-        self.stats["queue_size"] = self.queue.qsize()
+        # Carry the raw 16 bytes; the UUID is rebuilt only when the row is written
+        cid = conversation_id.bytes if isinstance(conversation_id, UUID) else conversation_id
+        message = _acquire(
+            cid,
+            role,
+            content,
+            user_id.bytes if isinstance(user_id, UUID) else user_id,
+            model_used,
+            created_at or time.time()
+        )
+        shard = hash(cid) % self.num_workers
+        self._shards[shard].append(message)
+        self._pending += 1
+        self._wakes[shard].set()
+        self.stats.messages_queued += 1
         
-        logger.debug(f"📝 Queued {role.value} message for conversation {conversation_id}")
+        _log_debug("📝 Queued %s message for conversation %s", role.value, conversation_id)
     
-    async def _worker(self):
-        """Background worker that processes queued messages"""
-        logger.info("🔄 Message queue worker started processing")
+    async def _worker(self, shard: int):
+        """Background worker that processes one shard's messages in batches"""
+        logger.info("🔄 Message queue worker %d started processing", shard)
+        dq = self._shards[shard]
+        wake = self._wakes[shard]
         
-        while self.is_running:
-            try:
-                # Get message from queue (wait up to 1 second)
-                try:
-                    message = await asyncio.wait_for(self.queue.get(), timeout=1.0)
-                except asyncio.TimeoutError:
+        if AsyncSessionLocal is None:
+            logger.error("❌ Database not configured; message queue worker not processing")
+            return
+        
+        # One session for the worker's lifetime (it only holds a pooled
+        # connection while a batch is being written), replaced if its
+        # connection dies
+        db = AsyncSessionLocal()
+        try:
+            while True:
+                if not dq:
+                    if not self.is_running:
+                        break
+                    wake.clear()
+                    await wake.wait()
                     continue
                 
-                # Process the message
-                await self._process_message(message)
-                self.queue.task_done()
-                
-            except Exception as e:
-                logger.error(f"❌ Error in message queue worker: {str(e)}")
-                await asyncio.sleep(1)  # Prevent tight error loop
+                # Take whatever is waiting, up to batch_size
+                batch = [dq.popleft() for _ in range(min(self.batch_size, len(dq)))]
+                self._pending -= len(batch)
+                try:
+                    await self._process_batch(db, batch)
+                except _SessionLost as lost:
+                    # Nothing is lost with the connection: the unsaved messages go
+                    # back to the front of the shard and a new session takes over
+                    self._restore(lost.unsaved)
+                    logger.error("❌ Message queue worker %d lost its database connection, reconnecting", shard)
+                    await _discard(db)
+                    await asyncio.sleep(1)  # Prevent tight error loop
+                    db = AsyncSessionLocal()
+                except Exception as e:
+                    logger.error(f"❌ Error in message queue worker: {str(e)}")
+                    await _rollback(db)
+                    await asyncio.sleep(1)  # Prevent tight error loop
+        finally:
+            await _discard(db)
+    
+    async def _process_batch(self, db: AsyncSession, batch: List[QueuedMessage]):
+        """Save a batch of messages with one insert, falling back to one-by-one on failure"""
+        if len(batch) == 1:
+            await self._process_message(db, batch[0])
+            return
+        
+        try:
+            saved = await message_crud.bulk_insert(db, [_row(message) for message in batch])
+            self.stats.messages_saved += saved
+            
+            logger.debug("💾 Saved batch of %d messages", saved)
+            for message in batch:
+                _release(message)
+            
+        except Exception as e:
+            # One bad row fails the whole insert; retry individually so only it is re-queued
+            logger.error(f"❌ Failed to save message batch, saving one by one: {str(e)}")
+            if not await _rollback(db):
+                raise _SessionLost(batch) from e
+            for index, message in enumerate(batch):
+                try:
+                    await self._process_message(db, message)
+                except _SessionLost as lost:
+                    raise _SessionLost(batch[index:]) from lost
     
-    async def _process_message(self, message: QueuedMessage):
+    async def _process_message(self, db: AsyncSession, message: QueuedMessage):
         """Process a single message and save to database"""
         try:
-            async for db in get_db():
-                # Create message in database with preserved created_at for ordering
-                message_create = MessageCreate(
-                    conversation_id=message.conversation_id,
-                    role=message.role,
-                    content=message.content,
-                    model_used=message.model_used
-                )
-                saved_message = await message_crud.create_with_extra(
-                    db,
-                    obj_in=message_create,
-                    extra_data={"created_at": message.created_at}
-                )
-                self.stats["messages_saved"] += 1
-                self.stats["queue_size"] = self.queue.qsize()
-                
-                logger.debug(f"💾 Saved {message.role.value} message {saved_message.id}")
-                return
-                
+            # Same prepared insert as the batch path, with preserved created_at for ordering
+            await message_crud.bulk_insert(db, [_row(message)])
+            self.stats.messages_saved += 1
+            
+            logger.debug("💾 Saved %s message for conversation %s", message.role.value, UUID(bytes=message.conversation_id))
+            _release(message)
+            
         except Exception as e:
             logger.error(f"❌ Failed to save message: {str(e)}")
+            if not await _rollback(db):
+                # The failure says nothing about the message; don't spend a retry on it
+                raise _SessionLost([message]) from e
             
             # Retry logic
             if message.retry_count < self.max_retries:
                 message.retry_count += 1
-                await self.queue.put(message)  # Re-queue for retry
-                logger.info(f"🔄 Retrying message (attempt {message.retry_count})")
+                if self.is_running:
+                    # Exponential backoff with full jitter so an outage isn't retried in a tight loop
+                    delay = random.uniform(
+                        0, min(self.retry_max_delay, self.retry_base_delay * (2 ** message.retry_count))
+                    )
+                    handle = asyncio.get_running_loop().call_later(delay, self._retry, message)
+                    self._retry_timers[id(message)] = (handle, message)
+                    logger.info("🔄 Retrying message in %.1fs (attempt %d)", delay, message.retry_count)
+                else:
+                    # Shutting down: retry right away, nothing will fire a delayed callback
+                    self._requeue(message)
+                    logger.info("🔄 Retrying message (attempt %d)", message.retry_count)
             else:
-                self.stats["messages_failed"] += 1
+                self.stats.messages_failed += 1
                 logger.error(f"💀 Message failed after {self.max_retries} retries")
+                _release(message)
     
-    async def _process_remaining_messages(self):
-        """Process any remaining messages when shutting down"""
-        remaining_count = self.queue.qsize()
-        if remaining_count > 0:
-            logger.info(f"🧹 Processing {remaining_count} remaining messages...")
-            
-            while not self.queue.empty():
-                try:
-                    message = self.queue.get_nowait()
-                    await self._process_message(message)
-                    self.queue.task_done()
-                except asyncio.QueueEmpty:
-                    break
-                except Exception as e:
-                    logger.error(f"❌ Error processing remaining message: {str(e)}")
+    def _restore(self, messages: List[QueuedMessage]):
+        """Put unsaved messages back at the front of their shard, in order (not counted as retries)"""
+        shard = hash(messages[0].conversation_id) % self.num_workers
+        self._shards[shard].extendleft(reversed(messages))
+        self._pending += len(messages)
+    
+    def _retry(self, message: QueuedMessage):
+        """Backoff timer callback"""
+        self._retry_timers.pop(id(message), None)
+        self._requeue(message)
+    
+    def _requeue(self, message: QueuedMessage):
+        """Put a message back on its conversation's shard for another attempt"""
+        if self._pending >= self.max_queue_size:
+            self.stats.messages_dropped += 1
+            logger.error("💀 Message queue full, dropping message retry")
+            _release(message)
+            return
+        shard = hash(message.conversation_id) % self.num_workers
+        self._shards[shard].append(message)
+        self._pending += 1
+        self._wakes[shard].set()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get queue statistics"""
         return {
-            **self.stats,
-            "queue_size": self.queue.qsize(),
+            **self.stats.as_dict(),
+            "queue_size": self._pending,
+            "num_workers": self.num_workers,
             "is_running": self.is_running
         }
 
@@ -183,34 +380,34 @@ class MessageQueue:
 message_queue = MessageQueue()
 
 # Convenience functions
-async def queue_user_message(
-    conversation_id: UUID,
+def queue_user_message(
+    conversation_id: Union[UUID, bytes],
     content: str,
-    user_id: UUID,
+    user_id: Union[UUID, bytes],
     *,
-    created_at: Optional[datetime] = None
+    created_at: Optional[float] = None
 ) -> None:
     """Queue a user message for persistence"""
-    await message_queue.add_message(
+    message_queue.add_message(
         conversation_id=conversation_id,
-        role=MessageRole.USER,
+        role=_ROLE_USER,
         content=content,
         user_id=user_id,
         created_at=created_at
     )
 
-async def queue_assistant_message(
-    conversation_id: UUID, 
+def queue_assistant_message(
+    conversation_id: Union[UUID, bytes], 
     content: str, 
-    user_id: UUID,
+    user_id: Union[UUID, bytes],
     model_used: Optional[str] = "gpt-4o-mini",
     *,
-    created_at: Optional[datetime] = None
+    created_at: Optional[float] = None
 ) -> None:
     """Queue an assistant message for persistence"""
-    await message_queue.add_message(
+    message_queue.add_message(
         conversation_id=conversation_id,
-        role=MessageRole.ASSISTANT,
+        role=_ROLE_ASSISTANT,
         content=content,
         user_id=user_id,
         model_used=model_used,
@@ -3,6 +3,8 @@ Centralized system prompts for CODRAFT AI Assistant.
 This module defines all LLM system prompts to avoid duplication across the codebase.
 """
 
+import hashlib
+
 SYSTEM_PROMPT_GENERAL_CHAT = """System Prompt (General Chat Mode)
 
 YOU are CODRAFT AI ASSISTANT — the central conversational assistant of the CODRAFT legal drafting platform.
@@ -30,3 +32,11 @@ Help users draft, understand, and refine legal content — while clearly stating
 Act as the front-door assistant, ensuring a seamless and guided experience across CODRAFT's ecosystem.
 
 Your purpose is to serve as the user's intelligent legal co-pilot and conversational companion, connecting discussion, drafting, and workflow throughout CODRAFT."""
+
+# Derived once at import so request handlers don't rebuild them per call
+SYSTEM_MESSAGE_GENERAL_CHAT = {"role": "system", "content": SYSTEM_PROMPT_GENERAL_CHAT}
+SYSTEM_PROMPT_GENERAL_CHAT_BYTES = SYSTEM_PROMPT_GENERAL_CHAT.encode("utf-8")
+# Stable key for provider-side prompt caching; changes whenever the prompt text does
+SYSTEM_PROMPT_GENERAL_CHAT_SHA256 = hashlib.sha256(SYSTEM_PROMPT_GENERAL_CHAT_BYTES).hexdigest()
+# Rough token count (~4 bytes per token) for budgeting without a tokenizer
+SYSTEM_PROMPT_GENERAL_CHAT_APPROX_TOKENS = len(SYSTEM_PROMPT_GENERAL_CHAT_BYTES) // 4
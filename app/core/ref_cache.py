@@ -0,0 +1,44 @@
+"""
+Process-wide cache for slowly-changing reference lookups.
+
+Billing reads the subscription tier and token pricing on almost every
+request; both only change through migrations or admin edits. Decorated CRUD
+methods keep a column snapshot of their result per argument tuple for `ttl`
+seconds, so changes are picked up within the TTL even without invalidation.
+"""
+
+import functools
+from typing import Any, Awaitable, Callable, TypeVar
+
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.crud_cache import snapshot, attach
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+def ref_cached(ttl: float = 60, maxsize: int = 256) -> Callable[[F], F]:
+    """
+    Cache a CRUD lookup `method(self, db, *args)` by its positional args.
+    
+    Only found rows are cached, so a row created after a miss is seen on the
+    next call. The wrapper's `invalidate()` drops every entry.
+    """
+    def decorator(method: F) -> F:
+        cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        
+        @functools.wraps(method)
+        async def wrapper(self, db: AsyncSession, *args: Any) -> Any:
+            values = cache.get(args)
+            if values is not None:
+                return await attach(db, self.model, values)
+            obj = await method(self, db, *args)
+            if obj is not None:
+                cache[args] = snapshot(obj, self._columns)
+            return obj
+        
+        wrapper.invalidate = cache.clear
+        return wrapper
+    
+    return decorator
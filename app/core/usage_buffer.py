@@ -0,0 +1,183 @@
+"""
+In-memory buffer for batched usage logging.
+
+Requests hand their usage rows to this buffer instead of writing them inline;
+a background worker bills each batch through the bill_and_log database
+function, pipelined in one round-trip and committed once.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Any
+
+from app.core.database import AsyncSessionLocal
+from app.services.billing_service import billing_service
+
+logger = logging.getLogger(__name__)
+
+
+class UsageBuffer:
+    """
+    Collects usage_log rows and writes them in batches.
+
+    A batch is flushed when it reaches `max_batch_size` rows or when
+    `flush_interval` seconds have passed since its first row, whichever
+    comes first.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 500,
+        flush_interval: float = 0.2,
+        max_retries: int = 3,
+        retry_base_delay: float = 0.5
+    ):
+        self.queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.is_running = False
+        self.worker_task: Optional[asyncio.Task] = None
+
+        # Stats for monitoring
+        self.stats = {
+            "entries_queued": 0,
+            "entries_written": 0,
+            "entries_duplicate": 0,
+            "entries_failed": 0,
+            "batches_flushed": 0
+        }
+
+    async def start(self):
+        """Start the background flusher (only with a database to flush to)"""
+        if AsyncSessionLocal is None:
+            logger.warning("Database not configured; usage buffer not started, usage is billed inline")
+            return
+        if not self.is_running:
+            self.is_running = True
+            self.worker_task = asyncio.create_task(self._worker())
+            logger.info("Usage buffer flusher started")
+
+    async def stop(self):
+        """Stop the background flusher and write anything still buffered"""
+        if self.is_running:
+            self.is_running = False
+            if self.worker_task:
+                await self.worker_task
+
+            while not self.queue.empty():
+                await self._flush(self._drain(self.max_batch_size))
+            logger.info("Usage buffer flusher stopped")
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """
+        Buffer a usage entry (keyword arguments of BillingService.log_usage).
+
+        This method is non-blocking and returns immediately.
+        """
+        self.queue.put_nowait(entry)
+        self.stats["entries_queued"] += 1
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        """Take up to `limit` entries that are already queued"""
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _worker(self):
+        """Background worker that groups queued entries into batches"""
+        loop = asyncio.get_running_loop()
+
+        while self.is_running:
+            try:
+                # Wait for the first entry of the next batch
+                try:
+                    first = await asyncio.wait_for(self.queue.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    continue
+
+                batch = [first]
+                deadline = loop.time() + self.flush_interval
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                await self._flush(batch)
+
+            except Exception as e:
+                logger.error(f"Error in usage buffer worker: {str(e)}")
+                await asyncio.sleep(1)  # Prevent tight error loop
+
+    async def _write(self, entries: List[Dict[str, Any]]) -> int:
+        """Bill entries in one transaction on a fresh session (a failed one is discarded)"""
+        async with AsyncSessionLocal() as db:
+            return await billing_service.bill_and_log_batch(db, entries)
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        """
+        Write one batch of usage entries.
+        
+        Billing rows must not be dropped: the batch is retried with backoff, and
+        if it still fails it is written one entry at a time so only an entry
+        that fails on its own is lost (and logged in full for reconciliation).
+        Retries can't double-bill: entries with an already logged request_id
+        are skipped by the batch write.
+        """
+        if not batch:
+            return
+        for attempt in range(self.max_retries + 1):
+            try:
+                written = await self._write(batch)
+                self.stats["entries_written"] += written
+                self.stats["entries_duplicate"] += len(batch) - written
+                self.stats["batches_flushed"] += 1
+                logger.debug(f"Flushed {written} usage entries")
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Failed to flush {len(batch)} usage entries, writing one by one: {str(e)}")
+                    break
+                delay = self.retry_base_delay * (2 ** attempt)
+                logger.warning(f"Failed to flush {len(batch)} usage entries, retrying in {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+
+        for entry in batch:
+            try:
+                written = await self._write([entry])
+                self.stats["entries_written"] += written
+                self.stats["entries_duplicate"] += 1 - written
+            except Exception as e:
+                self.stats["entries_failed"] += 1
+                logger.error(f"💀 Dropped usage entry after retries: {entry!r}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer statistics"""
+        return {
+            **self.stats,
+            "queue_size": self.queue.qsize(),
+            "is_running": self.is_running
+        }
+
+
+# Global usage buffer instance
+usage_buffer = UsageBuffer()
+
+
+async def start_usage_buffer() -> None:
+    """Start the global usage buffer"""
+    await usage_buffer.start()
+
+
+async def stop_usage_buffer() -> None:
+    """Stop the global usage buffer"""
+    await usage_buffer.stop()
@@ -1,50 +1,210 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
 from fastapi import WebSocket
-import json
+from pydantic import ValidationError
+import orjson
+from json.encoder import encode_basestring_ascii
+from functools import lru_cache
 import asyncio
 from openai import AsyncOpenAI
 from app.core.config import settings
 from app.schemas.chat import WebSocketMessage, EventType
 from app.core.message_queue import queue_user_message, queue_assistant_message
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal
 from app.crud.message import message_crud
 from uuid import UUID as _UUID, uuid4
+from datetime import datetime
 import logging
+import sys
 import httpx
+from cachetools import TTLCache
 from uuid import UUID
-from datetime import datetime
 import time
 
-from app.core.prompts import SYSTEM_PROMPT_GENERAL_CHAT
+from app.core.prompts import SYSTEM_MESSAGE_GENERAL_CHAT
 
 logger = logging.getLogger(__name__)
 
+# Streamed deltas are coalesced and sent once this many characters are buffered
+# or this many seconds have passed since the last frame, whichever comes first
+_STREAM_FLUSH_CHARS = 32
+_STREAM_FLUSH_INTERVAL = 0.02
+
+# Conversation history sent to OpenAI: how many prior messages, and how long an
+# idle conversation's built history is kept
+_HISTORY_LIMIT = 24
+_HISTORY_CACHE_TTL = 300
+
+# Outbound frames buffered per connection, and how many the writer takes per pass
+_OUTBOUND_QUEUE_SIZE = 1000
+_WRITER_BATCH = 64
+
+# A queued outbound item: a ready JSON frame, or a (stream_id, content) stream
+# delta that the writer may merge with adjacent deltas of the same stream
+OutboundItem = Union[str, Tuple[str, str]]
+
+
+def _dumps(obj) -> str:
+    """JSON-encode an outbound message (orjson; frames stay text)"""
+    return orjson.dumps(obj).decode()
+
+
+# Fixed-schema frames sent on every response; only the string fields vary
+_TYPING_FRAME = '{"type": "typing", "message": "AI is thinking...", "stream_id": %s}'
+_COMPLETE_FRAME = '{"type": "complete", "stream_id": %s, "message": %s}'
+_STREAM_PREFIX = '{"type": "stream", "stream_id": %s, "content": '
+_REVISION_ACCEPTED_FRAME = (
+    '{"type": "revision_accepted", "message": "Revision request accepted and is being processed", '
+    '"task_id": %s, "event_type": "REVISION"}'
+)
+
+
+def _json_str(value: Optional[str]) -> str:
+    """A str (or None) as a JSON value, escaped the way json.dumps does"""
+    return "null" if value is None else encode_basestring_ascii(value)
+
+
+@lru_cache(maxsize=256)
+def _stream_prefix(stream_id: Optional[str]) -> str:
+    """Start of a stream frame, built once per stream"""
+    return _STREAM_PREFIX % _json_str(stream_id)
+
+
+def _stream_frame(stream_id: Optional[str], content: str) -> str:
+    """Encode a stream frame without building and walking a dict per delta"""
+    return _stream_prefix(stream_id) + encode_basestring_ascii(content) + "}"
+
 class WebSocketManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+        # One outbound queue and writer task per connection; all sends go through them
+        self.out_queues: Dict[str, asyncio.Queue] = {}
+        self.writers: Dict[str, asyncio.Task] = {}
+        # Keep-alive pool for OpenAI, warmed by warm_up() so the first prompt skips the handshake
+        self.openai_http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=32)
+        )
+        self.client = (
+            AsyncOpenAI(api_key=settings.openai_api_key, http_client=self.openai_http_client)
+            if settings.openai_api_key else None
+        )
+        # Long-lived client so revision calls reuse pooled keep-alive connections
+        self.revision_client = httpx.AsyncClient(
+            timeout=settings.revision_api_timeout,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
         # Track the currently running streaming task per user for cancellation
         self.user_stream_tasks: Dict[str, asyncio.Task] = {}
+        # Built OpenAI history per conversation, with the version of the conversation's
+        # rows it reflects ((count, newest created_at, newest updated_at), see
+        # message_crud.get_history_version); messages queued here are appended so active
+        # conversations skip the history query
+        self._history_cache: TTLCache = TTLCache(maxsize=1024, ttl=_HISTORY_CACHE_TTL)
+        # Event type -> handler; register new event types here
+        self._event_handlers = {
+            EventType.CHAT: self.handle_chat_event,
+            EventType.REVISION: self.handle_revision_event,
+        }
 
     async def connect(self, websocket: WebSocket, user_id: str):
         await websocket.accept()
+        # One canonical key object per user for all the per-connection dicts
+        user_id = sys.intern(user_id)
+        self._stop_writer(user_id)
         self.active_connections[user_id] = websocket
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_OUTBOUND_QUEUE_SIZE)
+        self.out_queues[user_id] = queue
+        self.writers[user_id] = asyncio.create_task(self._writer_loop(user_id, websocket, queue))
 
     def disconnect(self, user_id: str):
         if user_id in self.active_connections:
             del self.active_connections[user_id]
+        self._stop_writer(user_id)
         # Best-effort cancel any running stream for this user
         task = self.user_stream_tasks.pop(user_id, None)
         if task and not task.done():
             task.cancel()
 
+    def _stop_writer(self, user_id: str):
+        self.out_queues.pop(user_id, None)
+        writer = self.writers.pop(user_id, None)
+        if writer and not writer.done():
+            writer.cancel()
+
+    async def _enqueue(self, user_id: str, item: OutboundItem):
+        queue = self.out_queues.get(user_id)
+        if queue is None:
+            return
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Client is not keeping up; wait for the writer rather than grow the buffer
+            await queue.put(item)
+
     async def send_personal_message(self, message: str, user_id: str):
-        if user_id in self.active_connections:
-            await self.active_connections[user_id].send_text(message)
+        await self._enqueue(user_id, message)
+
+    async def send_stream_delta(self, content: str, stream_id: str, user_id: str):
+        """Queue a stream delta; consecutive deltas of one stream may go out as one frame"""
+        await self._enqueue(user_id, (stream_id, content))
+
+    @staticmethod
+    def _merge_frames(items: List[OutboundItem]) -> List[str]:
+        """Encode queued items, joining runs of deltas from the same stream"""
+        frames: List[str] = []
+        run_id = None
+        run: List[str] = []
+        for item in items:
+            if isinstance(item, tuple) and item[0] == run_id:
+                run.append(item[1])
+                continue
+            if run:
+                frames.append(_stream_frame(run_id, "".join(run)))
+                run = []
+                run_id = None
+            if isinstance(item, tuple):
+                run_id, run = item[0], [item[1]]
+            else:
+                frames.append(item)
+        if run:
+            frames.append(_stream_frame(run_id, "".join(run)))
+        return frames
+
+    async def _writer_loop(self, user_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        """Single writer for a connection: drains the outbound queue in order"""
+        try:
+            while True:
+                items = [await queue.get()]
+                while len(items) < _WRITER_BATCH and not queue.empty():
+                    items.append(queue.get_nowait())
+                for frame in self._merge_frames(items):
+                    await websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"WebSocket writer for user {user_id} stopped: {str(e)}")
+            # Nothing drains the queue any more: unregister it so later sends are
+            # dropped, and empty it so senders blocked on a full queue return
+            if self.out_queues.get(user_id) is queue:
+                del self.out_queues[user_id]
+            if self.writers.get(user_id) is asyncio.current_task():
+                del self.writers[user_id]
+            while not queue.empty():
+                queue.get_nowait()
 
     async def handle_message(self, user_id: str, message: str):
         try:
-            data = json.loads(message)
+            # Event-format messages are parsed and validated in one pass by pydantic-core
+            if '"event_type"' in message:
+                try:
+                    ws_message = WebSocketMessage.model_validate_json(message)
+                except ValidationError:
+                    ws_message = None
+                if ws_message is not None:
+                    await self.handle_event_message(user_id, ws_message)
+                    return
+
+            # Legacy format, or an invalid event message (re-validated below for the error)
+            data = orjson.loads(message)
             
             # Check if it's the new event-based format
             if "event_type" in data:
@@ -56,29 +216,28 @@ class WebSocketManager:
         except Exception as e:
             logger.error(f"Error processing message from user {user_id}: {str(e)}")
             await self.send_personal_message(
-                json.dumps({"error": f"Error processing message: {str(e)}"}),
+                _dumps({"error": f"Error processing message: {str(e)}"}),
                 user_id
             )
 
-    async def handle_event_message(self, user_id: str, data: dict):
+    async def handle_event_message(self, user_id: str, data: Union[dict, WebSocketMessage]):
         """Handle new event-based message format"""
         try:
             # Validate message format
-            ws_message = WebSocketMessage(**data)
+            ws_message = data if isinstance(data, WebSocketMessage) else WebSocketMessage.model_validate(data)
             
-            if ws_message.event_type == EventType.CHAT:
-                await self.handle_chat_event(user_id, ws_message)
-            elif ws_message.event_type == EventType.REVISION:
-                await self.handle_revision_event(user_id, ws_message)
+            handler = self._event_handlers.get(ws_message.event_type)
+            if handler is not None:
+                await handler(user_id, ws_message)
             else:
                 await self.send_personal_message(
-                    json.dumps({"error": f"Unsupported event type: {ws_message.event_type}"}),
+                    _dumps({"error": f"Unsupported event type: {ws_message.event_type}"}),
                     user_id
                 )
                 
         except ValueError as e:
             await self.send_personal_message(
-                json.dumps({"error": f"Invalid message format: {str(e)}"}),
+                _dumps({"error": f"Invalid message format: {str(e)}"}),
                 user_id
             )
 
@@ -86,64 +245,45 @@ class WebSocketManager:
         """Handle regular chat events"""
         if not self.client:
             await self.send_personal_message(
-                json.dumps({"error": "OpenAI API not configured"}), 
+                _dumps({"error": "OpenAI API not configured"}), 
                 user_id
             )
             return
 
         # If a previous stream is in-flight, cancel and await it so partial
-        # response (if any) is persisted BEFORE we queue the new user message.
+        # response (if any) is persisted BEFORE we queue the new user message
+        # and read the history
         await self.cancel_current_stream(user_id)
+        conversation_id = ws_message.conversation_id
+        history = await self._load_history(conversation_id) if conversation_id else []
 
         # Queue the user message for persistence (timestamp: receive time)
+        received_at = time.time()
         if ws_message.conversation_id and ws_message.prompt:
             try:
-                await queue_user_message(
+                queue_user_message(
                     conversation_id=UUID(ws_message.conversation_id),
                     content=ws_message.prompt,
                     user_id=UUID(user_id),
-                    created_at=None  # enqueue with current time
+                    created_at=received_at
                 )
             except ValueError as e:
                 logger.error(f"Invalid UUID format - user_id: {user_id}, conversation_id: {ws_message.conversation_id}")
             except Exception as e:
                 logger.error(f"Failed to queue user message: {str(e)}")
 
-        # Build OpenAI messages with conversation history when available
-        messages: List[dict] = []
+        # Build OpenAI messages: the shared general chat system prompt, explicit
+        # context as an additional system message, prior messages (chronological)
+        # and the prompt. History is read before the prompt is queued, so it
+        # never contains it
         try:
-            # Always start with the general chat system prompt
-            messages.append({"role": "system", "content": SYSTEM_PROMPT_GENERAL_CHAT})
-
-            # Include explicit context as an additional system message
-            if ws_message.context:
-                messages.append({"role": "system", "content": f"Context: {ws_message.context}"})
-
-            # If we have a conversation_id, pull prior messages (chronological order)
-            if ws_message.conversation_id:
-                try:
-                    conv_uuid = _UUID(ws_message.conversation_id)
-                    async for db in get_db():
-                        history, _ = await message_crud.get_multi(
-                            db,
-                            filters={"conversation_id": conv_uuid},
-                            limit=24,
-                            order_by="created_at",
-                            order_desc=True
-                        )
-                        # Use most recent messages first from DB, then reverse to chronological
-                        for m in reversed(history):
-                            role = getattr(m, "role", None)
-                            content = getattr(m, "content", "")
-                            if role and content:
-                                messages.append({"role": role.value if hasattr(role, "value") else str(role), "content": content})
-                        break
-                except Exception as e:
-                    logger.warning(f"Failed to load conversation history: {str(e)}")
-
-            # Append the current user prompt last, unless it's already the last historical user message
-            if not (len(messages) > 0 and messages[-1].get("role") == "user" and messages[-1].get("content") == ws_message.prompt):
-                messages.append({"role": "user", "content": ws_message.prompt})
+            system = (
+                [SYSTEM_MESSAGE_GENERAL_CHAT, {"role": "system", "content": f"Context: {ws_message.context}"}]
+                if ws_message.context else [SYSTEM_MESSAGE_GENERAL_CHAT]
+            )
+            messages: List[dict] = system + history + [{"role": "user", "content": ws_message.prompt}]
+            if ws_message.conversation_id and ws_message.prompt:
+                self._remember(ws_message.conversation_id, "user", ws_message.prompt, received_at)
 
         except Exception as e:
             logger.error(f"Error building OpenAI messages: {str(e)}")
@@ -167,7 +307,7 @@ class WebSocketManager:
         # Validate required fields
         if not ws_message.context:
             await self.send_personal_message(
-                json.dumps({
+                _dumps({
                     "type": "error", 
                     "error": "Context (clause) is required for revision requests",
                     "task_id": ws_message.task_id,
@@ -180,17 +320,11 @@ class WebSocketManager:
         # Generate task ID if not provided
         task_id = ws_message.task_id
         if not task_id:
-            import uuid
-            task_id = str(uuid.uuid4())
+            task_id = uuid4().hex
         
         # Send immediate acknowledgment with task ID
         await self.send_personal_message(
-            json.dumps({
-                "type": "revision_accepted", 
-                "message": "Revision request accepted and is being processed",
-                "task_id": task_id,
-                "event_type": "REVISION"
-            }),
+            _REVISION_ACCEPTED_FRAME % _json_str(task_id),
             user_id
         )
         
@@ -214,48 +348,47 @@ class WebSocketManager:
             
             # Call the revision API
             revision_url = f"{settings.revision_api_url}/revision/process"
-            async with httpx.AsyncClient(timeout=settings.revision_api_timeout) as client:
-                response = await client.post(
-                    revision_url,
-                    json=revision_payload,
-                    headers={"Content-Type": "application/json"}
+            response = await self.revision_client.post(
+                revision_url,
+                json=revision_payload,
+                headers={"Content-Type": "application/json"}
+            )
+            
+            if response.status_code == 200:
+                revision_result = response.json()
+                logger.info(f"Revision API successful for task {task_id}: {revision_result}")
+                
+                # Send the revision result back to user with task ID
+                await self.send_personal_message(
+                    _dumps({
+                        "type": "revision_complete",
+                        "message": revision_result,
+                        "task_id": task_id,
+                        "event_type": "REVISION",
+                        "success": True
+                    }),
+                    user_id
+                )
+                
+            else:
+                error_msg = f"Revision API failed with status {response.status_code}: {response.text}"
+                logger.error(f"Revision failed for task {task_id}: {error_msg}")
+                
+                await self.send_personal_message(
+                    _dumps({
+                        "type": "revision_error",
+                        "error": f"Revision processing failed: {error_msg}",
+                        "task_id": task_id,
+                        "event_type": "REVISION"
+                    }),
+                    user_id
                 )
                 
-                if response.status_code == 200:
-                    revision_result = response.json()
-                    logger.info(f"Revision API successful for task {task_id}: {revision_result}")
-                    
-                    # Send the revision result back to user with task ID
-                    await self.send_personal_message(
-                        json.dumps({
-                            "type": "revision_complete",
-                            "message": revision_result,
-                            "task_id": task_id,
-                            "event_type": "REVISION",
-                            "success": True
-                        }),
-                        user_id
-                    )
-                    
-                else:
-                    error_msg = f"Revision API failed with status {response.status_code}: {response.text}"
-                    logger.error(f"Revision failed for task {task_id}: {error_msg}")
-                    
-                    await self.send_personal_message(
-                        json.dumps({
-                            "type": "revision_error",
-                            "error": f"Revision processing failed: {error_msg}",
-                            "task_id": task_id,
-                            "event_type": "REVISION"
-                        }),
-                        user_id
-                    )
-                    
         except httpx.TimeoutException:
             error_msg = f"Revision API request timed out for task {task_id}"
             logger.error(error_msg)
             await self.send_personal_message(
-                json.dumps({
+                _dumps({
                     "type": "revision_error",
                     "error": "Revision processing timed out",
                     "task_id": task_id,
@@ -268,7 +401,7 @@ class WebSocketManager:
             error_msg = f"Error processing revision for task {task_id}: {str(e)}"
             logger.error(error_msg)
             await self.send_personal_message(
-                json.dumps({
+                _dumps({
                     "type": "revision_error",
                     "error": f"Revision processing failed: {str(e)}",
                     "task_id": task_id,
@@ -284,18 +417,23 @@ class WebSocketManager:
         
         if not self.client:
             await self.send_personal_message(
-                json.dumps({"error": "OpenAI API not configured"}), 
+                _dumps({"error": "OpenAI API not configured"}), 
                 user_id
             )
             return
 
+        # Read history before queueing the prompt so it can't come back as a duplicate
+        history = await self._load_history(conversation_id) if conversation_id else []
+
         # Queue the user message for persistence (if conversation_id available)
+        received_at = time.time()
         if conversation_id and message_text:
             try:
-                await queue_user_message(
+                queue_user_message(
                     conversation_id=UUID(conversation_id),
                     content=message_text,
-                    user_id=UUID(user_id)
+                    user_id=UUID(user_id),
+                    created_at=received_at
                 )
             except ValueError as e:
                 logger.error(f"Invalid UUID format in legacy message - user_id: {user_id}, conversation_id: {conversation_id}")
@@ -303,31 +441,10 @@ class WebSocketManager:
                 logger.error(f"Failed to queue legacy user message: {str(e)}")
 
         # Build OpenAI messages including history when possible
-        messages: List[dict] = []
         try:
-            messages.append({"role": "system", "content": SYSTEM_PROMPT_GENERAL_CHAT})
-
-            if conversation_id:
-                try:
-                    conv_uuid = _UUID(conversation_id)
-                    async for db in get_db():
-                        history, _ = await message_crud.get_multi(
-                            db,
-                            filters={"conversation_id": conv_uuid},
-                            limit=24,
-                            order_by="created_at",
-                            order_desc=True
-                        )
-                        for m in reversed(history):
-                            role = getattr(m, "role", None)
-                            content = getattr(m, "content", "")
-                            if role and content:
-                                messages.append({"role": role.value if hasattr(role, "value") else str(role), "content": content})
-                        break
-                except Exception as e:
-                    logger.warning(f"Failed to load conversation history (legacy): {str(e)}")
-
-            messages.append({"role": "user", "content": message_text})
+            messages: List[dict] = [SYSTEM_MESSAGE_GENERAL_CHAT, *history, {"role": "user", "content": message_text}]
+            if conversation_id and message_text:
+                self._remember(conversation_id, "user", message_text, received_at)
         except Exception as e:
             logger.error(f"Error building legacy OpenAI messages: {str(e)}")
             messages = [
@@ -337,6 +454,76 @@ class WebSocketManager:
         
         await self._start_stream_openai_response(user_id, messages, conversation_id)
 
+    async def _load_history(self, conversation_id: str) -> List[dict]:
+        """Last 24 messages of a conversation as OpenAI messages, oldest first"""
+        messages: List[dict] = []
+        try:
+            conv_uuid = _UUID(conversation_id)
+            if AsyncSessionLocal is None:
+                raise RuntimeError("Database not configured")
+            async with AsyncSessionLocal() as db:
+                # The cached history is reused only while the conversation's rows are
+                # what it reflects, so writes from REST, other workers, deletes, or
+                # messages still in the queue when it was built force a re-read
+                version = await message_crud.get_history_version(db, conv_uuid)
+                cached = self._history_cache.get(conversation_id)
+                if cached is not None:
+                    (count, last_created, last_updated), cached_messages = cached
+                    if (count, last_created) == version[:2] and last_updated in (None, version[2]):
+                        if last_updated is None:
+                            self._history_cache[conversation_id] = (version, cached_messages)
+                        return list(cached_messages)
+                history, _ = await message_crud.get_multi(
+                    db,
+                    filters={"conversation_id": conv_uuid},
+                    limit=_HISTORY_LIMIT,
+                    order_by="created_at",
+                    order_desc=True,
+                    with_total=False
+                )
+            # Most recent messages come first from the DB; build in chronological order.
+            # Message.role is a MessageRole column, so its value is the OpenAI role
+            messages = [
+                {"role": m.role.value, "content": m.content}
+                for m in reversed(history)
+                if m.role and m.content
+            ]
+        except Exception as e:
+            logger.warning(f"Failed to load conversation history: {str(e)}")
+            return messages
+        self._history_cache[conversation_id] = (version, list(messages))
+        return messages
+
+    def _remember(self, conversation_id: str, role: str, content: str, created_at: float):
+        """Append a just-queued message to the conversation's cached history, if cached"""
+        cached = self._history_cache.get(conversation_id)
+        if cached is None:
+            return
+        (count, last_created, _), messages = cached
+        messages.append({"role": role, "content": content})
+        del messages[:-_HISTORY_LIMIT]
+        # The version the rows will have once the queue saves the message (it stores
+        # created_at as given); updated_at is set by the database, so the next
+        # lookup adopts whatever it reads
+        created = datetime.utcfromtimestamp(created_at)
+        if last_created is not None:
+            created = max(created, last_created)
+        self._history_cache[conversation_id] = ((count + 1, created, None), messages)
+
+    async def warm_up(self):
+        """Open a connection to OpenAI ahead of the first prompt (call on app startup)"""
+        if not self.client:
+            return
+        try:
+            await self.client.models.retrieve("gpt-4o-mini")
+        except Exception as e:
+            logger.warning(f"OpenAI warm-up failed: {str(e)}")
+
+    async def close(self):
+        """Release the pooled OpenAI and revision API connections (call on app shutdown)"""
+        await self.openai_http_client.aclose()
+        await self.revision_client.aclose()
+
     async def cancel_current_stream(self, user_id: str):
         """Cancel and await any currently running stream for the user.
         Ensures partial assistant content is persisted (handled inside task)."""
@@ -359,21 +546,28 @@ class WebSocketManager:
             prev.cancel()
             # Don't await here to avoid blocking; swallow cancellation later inside task
         # Start a new streaming task
-        stream_id = str(uuid4())
+        stream_id = uuid4().hex
         task = asyncio.create_task(self._stream_openai_response(user_id, messages, conversation_id, stream_id))
         self.user_stream_tasks[user_id] = task
+        task.add_done_callback(lambda t: self._forget_stream(user_id, t))
+
+    def _forget_stream(self, user_id: str, task: asyncio.Task):
+        """Drop a finished stream task, unless a newer stream has replaced it"""
+        if self.user_stream_tasks.get(user_id) is task:
+            del self.user_stream_tasks[user_id]
 
     async def _stream_openai_response(self, user_id: str, messages: List[dict], conversation_id: str = None, stream_id: str | None = None):
         """Stream response from OpenAI with buffered flushes for smooth UX.
         This method runs inside an asyncio Task so it can be cancelled when a new prompt arrives."""
-        # Accumulate partials so that on cancellation we can persist what we have
-        full_response = ""
+        # Accumulate partials so that on cancellation we can persist what we have;
+        # joined once when the stream completes or is cancelled
+        parts: List[str] = []
         # Record generation start so DB ordering stays correct
         generation_started_at = time.time()
         try:
             # Send typing indicator
             await self.send_personal_message(
-                json.dumps({"type": "typing", "message": "AI is thinking...", "stream_id": stream_id}),
+                _TYPING_FRAME % _json_str(stream_id),
                 user_id
             )
 
@@ -385,24 +579,36 @@ class WebSocketManager:
                 max_tokens=500
             )
 
-            # Character-by-character throttled streaming (smooth human-like)
+            # Coalesced streaming: one frame per buffered run of deltas, with the
+            # configured delay applied between frames rather than per character
             delay = max(0, settings.stream_char_delay_ms) / 1000.0
+            loop = asyncio.get_running_loop()
+            buf: List[str] = []
+            buffered = 0
+            last_flush = loop.time()
 
             async for chunk in response:
                 if chunk.choices[0].delta.content is not None:
                     content = chunk.choices[0].delta.content
-                    full_response += content
-                    for ch in content:
-                        await self.send_personal_message(
-                            json.dumps({"type": "stream", "content": ch, "stream_id": stream_id}),
-                            user_id
-                        )
+                    parts.append(content)
+                    buf.append(content)
+                    buffered += len(content)
+                    if buffered >= _STREAM_FLUSH_CHARS or loop.time() - last_flush >= _STREAM_FLUSH_INTERVAL:
+                        await self.send_stream_delta("".join(buf), stream_id, user_id)
+                        buf.clear()
+                        buffered = 0
                         if delay:
                             await asyncio.sleep(delay)
+                        last_flush = loop.time()
+
+            # Flush whatever is left before signalling completion
+            if buf:
+                await self.send_stream_delta("".join(buf), stream_id, user_id)
 
             # Send completion signal
+            full_response = "".join(parts)
             await self.send_personal_message(
-                json.dumps({"type": "complete", "message": full_response, "stream_id": stream_id}),
+                _COMPLETE_FRAME % (_json_str(stream_id), encode_basestring_ascii(full_response)),
                 user_id
             )
             
@@ -410,13 +616,14 @@ class WebSocketManager:
             if conversation_id and full_response:
                 try:
                     # Preserve created_at around generation start for correct ordering
-                    await queue_assistant_message(
+                    queue_assistant_message(
                         conversation_id=UUID(conversation_id),
                         content=full_response,
                         user_id=UUID(user_id),
                         model_used="gpt-4o-mini",
-                        created_at=datetime.utcfromtimestamp(generation_started_at)
+                        created_at=generation_started_at
                     )
+                    self._remember(conversation_id, "assistant", full_response, generation_started_at)
                 except ValueError as e:
                     logger.error(f"Invalid UUID format - user_id: {user_id}, conversation_id: {conversation_id}")
                 except Exception as e:
@@ -426,15 +633,17 @@ class WebSocketManager:
             # Task was cancelled due to a new prompt or disconnect; stop streaming immediately
             logger.info(f"Streaming task cancelled for user {user_id}")
             # Persist partial assistant message if any
+            full_response = "".join(parts)
             if conversation_id and full_response:
                 try:
-                    await queue_assistant_message(
+                    queue_assistant_message(
                         conversation_id=UUID(conversation_id),
                         content=full_response,
                         user_id=UUID(user_id),
                         model_used="gpt-4o-mini",
-                        created_at=datetime.utcfromtimestamp(generation_started_at)
+                        created_at=generation_started_at
                     )
+                    self._remember(conversation_id, "assistant", full_response, generation_started_at)
                 except Exception as e:
                     logger.error(f"Failed to persist partial assistant message on cancel: {str(e)}")
             # Optionally notify client; frontend already guards stale events, so keep quiet
@@ -442,11 +651,6 @@ class WebSocketManager:
         except Exception as e:
             logger.error(f"Error streaming OpenAI response: {str(e)}")
             await self.send_personal_message(
-                json.dumps({"error": f"Error getting AI response: {str(e)}"}),
+                _dumps({"error": f"Error getting AI response: {str(e)}"}),
                 user_id
-            ) 
-        finally:
-            # Clear completed/cancelled task reference
-            current = self.user_stream_tasks.get(user_id)
-            if current and current.done():
-                self.user_stream_tasks.pop(user_id, None)
\ No newline at end of file
+            ) 
\ No newline at end of file
@@ -1,10 +1,12 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union, Tuple
+import operator
+from typing import Any, Callable, Dict, Generic, List, Optional, Type, TypeVar, Union, Tuple
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncScalarResult
+from sqlalchemy import select, insert, update, delete, func, and_, or_, literal, inspect, lambda_stmt
 from sqlalchemy.orm import selectinload
 from app.models.base import Base
+from app.core.crud_cache import crud_cache, snapshot, attach
 from app.core.exceptions import NotFoundError
 from uuid import UUID
 
@@ -12,35 +14,94 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+def _in(column: Any, values: Any) -> Any:
+    return column.in_(values)
+
+# Operators accepted in dict-valued get_multi filters, e.g. {"gte": 10, "lte": 20}
+_FILTER_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    "eq": operator.eq,
+    "gte": operator.ge,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "lt": operator.lt,
+    "like": lambda column, value: column.like(f"%{value}%"),
+    "ilike": lambda column, value: column.ilike(f"%{value}%"),
+    "in": _in,
+}
+
+def _dump(obj_in: Any) -> Dict[str, Any]:
+    """Column values from a create schema.
+    
+    Pydantic models are dumped in python mode, which keeps date, datetime and
+    UUID values native; jsonable_encoder (which turns them into strings) is
+    only the fallback for anything else."""
+    if isinstance(obj_in, BaseModel):
+        return obj_in.model_dump(mode="python", exclude_unset=True)
+    return jsonable_encoder(obj_in)
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
+        # Resolved once so filters and ordering skip the attribute protocol. Only
+        # the table is needed here; relationships are resolved on first use,
+        # after every model has been imported and the mappers can configure
+        self._columns = {column.key: getattr(model, column.key) for column in model.__table__.columns}
+        self._relation_attrs: Optional[Dict[str, Any]] = None
+        # Read-mostly models opt in to caching get() with `__crud_cache__ = True`
+        self._cache_enabled = getattr(model, "__crud_cache__", False)
+        self._cache_name = model.__name__
+        # Table-level insert for bulk loads that don't need ORM objects back
+        self._core_insert = insert(model.__table__)
+
+    @property
+    def _relations(self) -> Dict[str, Any]:
+        if self._relation_attrs is None:
+            self._relation_attrs = {rel.key: getattr(self.model, rel.key) for rel in inspect(self.model).relationships}
+        return self._relation_attrs
+
+    def cache_key(self, id: Any) -> Tuple[str, str]:
+        """Key for a record in the get() cache; override to change cache granularity"""
+        return (self._cache_name, str(id))
+
+    def _invalidate(self, id: Any) -> None:
+        if self._cache_enabled:
+            crud_cache.invalidate(self.cache_key(id))
 
     async def get(self, db: AsyncSession, id: Any, *, raise_if_not_found: bool = True) -> Optional[ModelType]:
         """Get a single record by ID (not soft deleted)"""
-        result = await db.execute(
-            select(self.model).where(
-                and_(self.model.id == id, self.model.is_deleted == False)
-            )
-        )
+        if self._cache_enabled:
+            values = crud_cache.get(self.cache_key(id))
+            if values is not None:
+                return await attach(db, self.model, values)
+        
+        # Lambda statements are built and cache-keyed once per model; later
+        # calls only bind the new id
+        model = self.model
+        stmt = lambda_stmt(lambda: select(model))
+        stmt += lambda s: s.where(and_(model.id == id, model.is_deleted == False))
+        result = await db.execute(stmt)
         obj = result.scalar_one_or_none()
         
         if raise_if_not_found and obj is None:
             raise NotFoundError(f"{self.model.__name__}")
         
+        if self._cache_enabled and obj is not None:
+            crud_cache.set(self.cache_key(id), snapshot(obj, self._columns))
+        
         return obj
 
     async def get_by_user_id(self, db: AsyncSession, id: Any, user_id: str, *, raise_if_not_found: bool = True) -> Optional[ModelType]:
         """Get a single record by ID and user_id (not soft deleted)"""
-        result = await db.execute(
-            select(self.model).where(
-                and_(
-                    self.model.id == id, 
-                    self.model.user_id == user_id,
-                    self.model.is_deleted == False
-                )
+        model = self.model
+        stmt = lambda_stmt(lambda: select(model))
+        stmt += lambda s: s.where(
+            and_(
+                model.id == id,
+                model.user_id == user_id,
+                model.is_deleted == False
             )
         )
+        result = await db.execute(stmt)
         obj = result.scalar_one_or_none()
         
         if raise_if_not_found and obj is None:
@@ -57,9 +118,18 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         filters: Optional[Dict[str, Any]] = None,
         order_by: Optional[str] = None,
         order_desc: bool = True,
-        include_deleted: bool = False
-    ) -> Tuple[List[ModelType], int]:
-        """Get multiple records with pagination and filtering"""
+        include_deleted: bool = False,
+        with_total: bool = True,
+        as_stream: bool = False
+    ) -> Tuple[Union[List[ModelType], AsyncScalarResult], Optional[int]]:
+        """Get multiple records with pagination and filtering.
+        
+        The total is counted with a window function on the same query; pass
+        with_total=False when it isn't needed and None is returned instead.
+        
+        With as_stream=True the rows are fetched from a server-side cursor in
+        chunks and returned as an async iterator (iterate it once, before the
+        session closes); the total is not counted and is always None."""
         if include_deleted:
             query = select(self.model)
         else:
@@ -69,39 +139,32 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if filters:
             filter_conditions = []
             for field, value in filters.items():
-                if hasattr(self.model, field):
-                    if isinstance(value, (list, tuple)):
-                        filter_conditions.append(getattr(self.model, field).in_(value))
-                    elif isinstance(value, dict):
-                        # Handle range queries like {"gte": 10, "lte": 20}
-                        field_obj = getattr(self.model, field)
-                        for op, val in value.items():
-                            if op == "gte":
-                                filter_conditions.append(field_obj >= val)
-                            elif op == "lte":
-                                filter_conditions.append(field_obj <= val)
-                            elif op == "gt":
-                                filter_conditions.append(field_obj > val)
-                            elif op == "lt":
-                                filter_conditions.append(field_obj < val)
-                            elif op == "like":
-                                filter_conditions.append(field_obj.like(f"%{val}%"))
-                            elif op == "ilike":
-                                filter_conditions.append(field_obj.ilike(f"%{val}%"))
-                    else:
-                        filter_conditions.append(getattr(self.model, field) == value)
+                field_obj = self._columns.get(field)
+                if field_obj is None:
+                    continue
+                if isinstance(value, (list, tuple)):
+                    filter_conditions.append(_in(field_obj, value))
+                elif isinstance(value, dict):
+                    # Handle range queries like {"gte": 10, "lte": 20}; unknown operators are ignored
+                    for op, val in value.items():
+                        fn = _FILTER_OPS.get(op)
+                        if fn is not None:
+                            filter_conditions.append(fn(field_obj, val))
+                else:
+                    filter_conditions.append(field_obj == value)
             
             if filter_conditions:
                 query = query.where(and_(*filter_conditions))
         
-        # Get total count for pagination
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
+        filtered = query
+        with_total = with_total and not as_stream
+        if with_total:
+            # Total matching rows (before offset/limit) alongside every row of the page
+            query = query.add_columns(func.count().over().label("_total"))
         
         # Apply ordering
-        if order_by and hasattr(self.model, order_by):
-            order_field = getattr(self.model, order_by)
+        if order_by and order_by in self._columns:
+            order_field = self._columns[order_by]
             if order_desc:
                 query = query.order_by(order_field.desc())
             else:
@@ -113,8 +176,24 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         # Apply pagination
         query = query.offset(skip).limit(limit)
         
+        if as_stream:
+            result = await db.stream(query.execution_options(yield_per=256))
+            return result.scalars(), None
+        
         result = await db.execute(query)
-        items = result.scalars().all()
+        if not with_total:
+            return result.scalars().all(), None
+        
+        rows = result.all()
+        items = [row[0] for row in rows]
+        if rows:
+            total = rows[0]._total
+        elif skip:
+            # Page past the end: the window has no rows to report the total on
+            count_query = select(func.count()).select_from(filtered.subquery())
+            total = (await db.execute(count_query)).scalar()
+        else:
+            total = 0
         
         return items, total
 
@@ -125,17 +204,19 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         field: str, 
         value: Any,
         skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[List[ModelType], int]:
+        limit: int = 100,
+        with_total: bool = True
+    ) -> Tuple[List[ModelType], Optional[int]]:
         """Get records by a specific field value with pagination (not soft deleted)"""
-        if not hasattr(self.model, field):
+        if field not in self._columns:
             raise ValueError(f"Field '{field}' does not exist on model {self.model.__name__}")
         
         return await self.get_multi(
             db, 
             skip=skip, 
             limit=limit, 
-            filters={field: value}
+            filters={field: value},
+            with_total=with_total
         )
 
     async def get_by_fields(
@@ -144,77 +225,115 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         *, 
         filters: Dict[str, Any],
         skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[List[ModelType], int]:
+        limit: int = 100,
+        with_total: bool = True
+    ) -> Tuple[List[ModelType], Optional[int]]:
         """Get records by multiple field values with pagination (not soft deleted)"""
         return await self.get_multi(
             db, 
             skip=skip, 
             limit=limit, 
-            filters=filters
+            filters=filters,
+            with_total=with_total
         )
 
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         """Create a new record"""
-        # Use model_dump() to preserve Python types (date, datetime, etc.)
-        # instead of jsonable_encoder which converts them to strings
-        if hasattr(obj_in, 'model_dump'):
-            obj_in_data = obj_in.model_dump(exclude_unset=True)
-        elif hasattr(obj_in, 'dict'):
-            obj_in_data = obj_in.dict(exclude_unset=True)
-        else:
-            obj_in_data = jsonable_encoder(obj_in)
-        
+        obj_in_data = _dump(obj_in)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
         return db_obj
 
-    async def create_with_extra(self, db: AsyncSession, *, obj_in: CreateSchemaType, extra_data: Dict[str, Any]) -> ModelType:
-        """Create a new record with additional fields"""
-        # Use model_dump() to preserve Python types (date, datetime, etc.)
-        if hasattr(obj_in, 'model_dump'):
-            obj_in_data = obj_in.model_dump(exclude_unset=True)
-        elif hasattr(obj_in, 'dict'):
-            obj_in_data = obj_in.dict(exclude_unset=True)
-        else:
-            obj_in_data = jsonable_encoder(obj_in)
+    async def create_with_extra(
+        self, db: AsyncSession, *, obj_in: CreateSchemaType, extra_data: Dict[str, Any], commit: bool = True
+    ) -> ModelType:
+        """Create a new record with additional fields.
         
+        With commit=False the row is only flushed (so its id and defaults are
+        set) and the caller commits it together with the rest of its transaction."""
+        obj_in_data = _dump(obj_in)
         obj_in_data.update(extra_data)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
+        if not commit:
+            await db.flush()
+            return db_obj
         await db.commit()
         await db.refresh(db_obj)
         return db_obj
 
+    async def bulk_create_with_extra(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: List[CreateSchemaType],
+        extras: List[Dict[str, Any]]
+    ) -> int:
+        """Insert many records (each with its own extra fields) in one statement and commit once"""
+        rows = []
+        for obj_in, extra_data in zip(objs_in, extras):
+            obj_in_data = obj_in.model_dump(exclude_unset=True)
+            obj_in_data.update(extra_data)
+            rows.append(obj_in_data)
+        return await self.bulk_insert_core(db, rows)
+
+    async def bulk_insert_core(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+        """Insert plain column dicts with a Core executemany and commit once.
+        
+        Bypasses the ORM entirely (no identity map, events or RETURNING); use it
+        for imports and seeding where the created rows aren't needed back."""
+        if not rows:
+            return 0
+        await db.execute(self._core_insert, rows)
+        await db.commit()
+        return len(rows)
+
+    async def bulk_create(self, db: AsyncSession, *, objs_in: List[CreateSchemaType]) -> List[Any]:
+        """Insert many records in one batched INSERT ... RETURNING id and commit once.
+        
+        Lighter than create_multi when only the new ids are needed: no ORM
+        objects are built for the inserted rows."""
+        if not objs_in:
+            return []
+        rows = [_dump(obj_in) for obj_in in objs_in]
+        # An executemany with RETURNING is sent as multi-row VALUES pages
+        # (insertmanyvalues), not one INSERT per row
+        result = await db.scalars(self._core_insert.returning(self.model.__table__.c.id), rows)
+        ids = list(result.all())
+        await db.commit()
+        return ids
+
     async def create_multi(
         self, 
         db: AsyncSession, 
         *, 
-        objs_in: List[CreateSchemaType]
+        objs_in: List[CreateSchemaType],
+        return_objects: bool = True
     ) -> List[ModelType]:
-        """Create multiple records"""
-        db_objs = []
-        for obj_in in objs_in:
-            # Use model_dump() to preserve Python types (date, datetime, etc.)
-            if hasattr(obj_in, 'model_dump'):
-                obj_in_data = obj_in.model_dump(exclude_unset=True)
-            elif hasattr(obj_in, 'dict'):
-                obj_in_data = obj_in.dict(exclude_unset=True)
-            else:
-                obj_in_data = jsonable_encoder(obj_in)
-            
-            db_obj = self.model(**obj_in_data)
-            db_objs.append(db_obj)
+        """Create multiple records with one INSERT ... RETURNING (no refresh per row).
         
-        db.add_all(db_objs)
-        await db.commit()
+        With return_objects=False the rows go through bulk_insert_core and an
+        empty list is returned."""
+        if not objs_in:
+            return []
         
-        # Refresh all objects
-        for db_obj in db_objs:
-            await db.refresh(db_obj)
+        # Check the type once from the first item; the list is one schema type
+        if isinstance(objs_in[0], BaseModel):
+            dump = type(objs_in[0]).model_dump
+            rows = [dump(obj_in, mode="python", exclude_unset=True) for obj_in in objs_in]
+        else:
+            rows = [jsonable_encoder(obj_in) for obj_in in objs_in]
         
+        if not return_objects:
+            await self.bulk_insert_core(db, rows)
+            return []
+        
+        # RETURNING hydrates ids and server defaults in the same round-trip
+        result = await db.scalars(insert(self.model).returning(self.model), rows)
+        db_objs = list(result.all())
+        await db.commit()
         return db_objs
 
     async def update(
@@ -225,18 +344,19 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
         """Update a record"""
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
-            update_data = obj_in.dict(exclude_unset=True)
+            update_data = obj_in.model_dump(exclude_unset=True)
         
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        # Set only the given values that are columns; no need to serialize db_obj
+        for field, value in update_data.items():
+            if field in self._columns:
+                setattr(db_obj, field, value)
         
         db.add(db_obj)
         await db.commit()
+        self._invalidate(db_obj.id)
         await db.refresh(db_obj)
         return db_obj
 
@@ -248,11 +368,32 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in: Union[UpdateSchemaType, Dict[str, Any]],
         raise_if_not_found: bool = True
     ) -> Optional[ModelType]:
-        """Update a record by ID"""
-        db_obj = await self.get(db, id=id, raise_if_not_found=raise_if_not_found)
-        if db_obj:
-            return await self.update(db, db_obj=db_obj, obj_in=obj_in)
-        return None
+        """Update a record by ID with one UPDATE ... RETURNING"""
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        values = {field: value for field, value in update_data.items() if field in self._columns}
+        if not values:
+            return await self.get(db, id=id, raise_if_not_found=raise_if_not_found)
+        
+        result = await db.execute(
+            update(self.model)
+            .where(and_(self.model.id == id, self.model.is_deleted == False))
+            .values(**values)
+            .returning(self.model)
+            # RETURNING must overwrite an instance already in the identity map,
+            # or the caller gets its pre-update values back
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        db_obj = result.scalar_one_or_none()
+        await db.commit()
+        self._invalidate(id)
+        
+        if raise_if_not_found and db_obj is None:
+            raise NotFoundError(f"{self.model.__name__}")
+        
+        return db_obj
 
     async def update_by_field(
         self,
@@ -263,7 +404,29 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> List[ModelType]:
         """Update records by field value"""
-        items, _ = await self.get_by_field(db, field=field, value=value)
+        if isinstance(obj_in, dict):
+            # Plain column values: one UPDATE ... RETURNING instead of a select plus one update per row
+            if field not in self._columns:
+                raise ValueError(f"Field '{field}' does not exist on model {self.model.__name__}")
+            result = await db.scalars(
+                update(self.model)
+                .where(
+                    and_(
+                        self._columns[field] == value,
+                        self.model.is_deleted == False
+                    )
+                )
+                .values(**obj_in)
+                .returning(self.model)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            updated_items = list(result.all())
+            await db.commit()
+            for item in updated_items:
+                self._invalidate(item.id)
+            return updated_items
+        
+        items, _ = await self.get_by_field(db, field=field, value=value, with_total=False)
         updated_items = []
         for item in items:
             updated_item = await self.update(db, db_obj=item, obj_in=obj_in)
@@ -271,17 +434,21 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return updated_items
 
     async def soft_delete(self, db: AsyncSession, *, id: Any, raise_if_not_found: bool = True) -> bool:
-        """Soft delete a record by ID"""
+        """Soft delete a record by ID.
+        
+        The session is not synchronized: an instance of this row already loaded
+        in the session keeps is_deleted=False until it is refreshed."""
         result = await db.execute(
             update(self.model).where(
                 and_(
                     self.model.id == id,
                     self.model.is_deleted == False
                 )
-            ).values(is_deleted=True)
+            ).values(is_deleted=True).execution_options(synchronize_session=False)
         )
         
         await db.commit()
+        self._invalidate(id)
         rows_affected = result.rowcount
         
         if raise_if_not_found and rows_affected == 0:
@@ -290,7 +457,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return rows_affected > 0
 
     async def soft_delete_by_user_id(self, db: AsyncSession, *, id: Any, user_id: str, raise_if_not_found: bool = True) -> bool:
-        """Soft delete a record by ID and user_id"""
+        """Soft delete a record by ID and user_id (session not synchronized, as in soft_delete)"""
         result = await db.execute(
             update(self.model).where(
                 and_(
@@ -298,10 +465,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                     self.model.user_id == user_id,
                     self.model.is_deleted == False
                 )
-            ).values(is_deleted=True)
+            ).values(is_deleted=True).execution_options(synchronize_session=False)
         )
         
         await db.commit()
+        self._invalidate(id)
         rows_affected = result.rowcount
         
         if raise_if_not_found and rows_affected == 0:
@@ -310,17 +478,18 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return rows_affected > 0
 
     async def remove(self, db: AsyncSession, *, id: Any, raise_if_not_found: bool = True) -> bool:
-        """Hard delete a record by ID"""
+        """Hard delete a record by ID (an already loaded instance is not expunged from the session)"""
         result = await db.execute(
             delete(self.model).where(
                 and_(
                     self.model.id == id,
                     self.model.is_deleted == False
                 )
-            )
+            ).execution_options(synchronize_session=False)
         )
         
         await db.commit()
+        self._invalidate(id)
         rows_affected = result.rowcount
         
         if raise_if_not_found and rows_affected == 0:
@@ -336,22 +505,32 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         value: Any
     ) -> int:
         """Hard delete records by field value"""
-        items, _ = await self.get_by_field(db, field=field, value=value)
-        deleted_count = 0
-        for item in items:
-            await db.delete(item)
-            deleted_count += 1
+        if field not in self._columns:
+            raise ValueError(f"Field '{field}' does not exist on model {self.model.__name__}")
+        
+        result = await db.execute(
+            delete(self.model).where(
+                and_(
+                    self._columns[field] == value,
+                    self.model.is_deleted == False
+                )
+            ).execution_options(synchronize_session=False)
+        )
+        
         await db.commit()
-        return deleted_count
+        if self._cache_enabled:
+            crud_cache.invalidate_model(self._cache_name)
+        return result.rowcount
 
     async def exists(self, db: AsyncSession, *, id: Any) -> bool:
         """Check if a record exists by ID (not soft deleted)"""
+        # SELECT 1 ... LIMIT 1 stops at the first match instead of counting them all
         result = await db.execute(
-            select(func.count()).where(
+            select(literal(1)).where(
                 and_(self.model.id == id, self.model.is_deleted == False)
-            )
+            ).limit(1)
         )
-        return result.scalar() > 0
+        return result.scalar() is not None
 
     async def exists_by_field(
         self, 
@@ -361,18 +540,18 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         value: Any
     ) -> bool:
         """Check if a record exists by field value (not soft deleted)"""
-        if not hasattr(self.model, field):
+        if field not in self._columns:
             raise ValueError(f"Field '{field}' does not exist on model {self.model.__name__}")
         
         result = await db.execute(
-            select(func.count()).where(
+            select(literal(1)).where(
                 and_(
-                    getattr(self.model, field) == value,
+                    self._columns[field] == value,
                     self.model.is_deleted == False
                 )
-            )
+            ).limit(1)
         )
-        return result.scalar() > 0
+        return result.scalar() is not None
 
     async def count(
         self, 
@@ -386,11 +565,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if filters:
             filter_conditions = []
             for field, value in filters.items():
-                if hasattr(self.model, field):
+                if field in self._columns:
                     if isinstance(value, (list, tuple)):
-                        filter_conditions.append(getattr(self.model, field).in_(value))
+                        filter_conditions.append(self._columns[field].in_(value))
                     else:
-                        filter_conditions.append(getattr(self.model, field) == value)
+                        filter_conditions.append(self._columns[field] == value)
             
             if filter_conditions:
                 query = query.where(and_(*filter_conditions))
@@ -412,8 +591,8 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
         
         for relation in relations:
-            if hasattr(self.model, relation):
-                query = query.options(selectinload(getattr(self.model, relation)))
+            if relation in self._relations:
+                query = query.options(selectinload(self._relations[relation]))
         
         result = await db.execute(query)
         obj = result.scalar_one_or_none()
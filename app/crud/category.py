@@ -1,6 +1,7 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from .base import CRUDBase
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate
@@ -8,14 +9,19 @@ from app.schemas.category import CategoryCreate, CategoryUpdate
 class CRUDCategory(CRUDBase[Category, CategoryCreate, CategoryUpdate]):
     async def get_or_create_by_name(self, db: AsyncSession, *, name: str, description: Optional[str] = None) -> Category:
         """Get existing category by name or create new one"""
-        # Use base CRUD get_by_field method instead of custom get_by_name
-        categories, _ = await self.get_by_field(db, field="name", value=name, limit=1)
-        category = categories[0] if categories else None
-        
-        if category:
-            return category
-        
-        category_data = CategoryCreate(name=name, description=description)
-        return await self.create(db, obj_in=category_data)
+        # One atomic upsert: concurrent callers can't both insert the same name.
+        # DO UPDATE (not DO NOTHING) so RETURNING yields the existing row too;
+        # a soft-deleted category with this name is brought back
+        stmt = (
+            pg_insert(Category)
+            .values(name=name, description=description)
+            .on_conflict_do_update(index_elements=["name"], set_={"name": name, "is_deleted": False})
+            .returning(Category)
+            .execution_options(populate_existing=True)
+        )
+        result = await db.execute(stmt)
+        category = result.scalar_one()
+        await db.commit()
+        return category
 
-category_crud = CRUDCategory(Category) 
\ No newline at end of file
+category_crud = CRUDCategory(Category) 
@@ -14,20 +14,36 @@ class CRUDConversation(CRUDBase[Conversation, ConversationCreate, ConversationUp
     async def soft_delete_with_cascade(
         self, db: AsyncSession, *, conversation_id: UUID, user_id: str, raise_if_not_found: bool = True
     ) -> bool:
-        """Soft delete a conversation and all its child objects"""
-        from .message import message_crud
-        from .file import file_crud
-        
-        updated_messages = await message_crud.update_by_field(
-            db, field="conversation_id", value=conversation_id, obj_in={"is_deleted": True}
+        """Soft delete a conversation and all its child objects in one transaction"""
+        result = await db.execute(
+            update(Conversation).where(
+                and_(
+                    Conversation.id == conversation_id,
+                    Conversation.user_id == user_id,
+                    Conversation.is_deleted == False
+                )
+            ).values(is_deleted=True)
         )
         
-        updated_files = await file_crud.update_by_field(
-            db, field="conversation_id", value=conversation_id, obj_in={"is_deleted": True}
-        )
+        # Only cascade once the conversation is known to belong to the user
+        if result.rowcount == 0:
+            await db.rollback()
+            if raise_if_not_found:
+                raise NotFoundError(f"{self.model.__name__}")
+            return False
         
-        return await self.soft_delete_by_user_id(
-            db, id=conversation_id, user_id=user_id, raise_if_not_found=raise_if_not_found
+        await db.execute(
+            update(Message).where(
+                and_(Message.conversation_id == conversation_id, Message.is_deleted == False)
+            ).values(is_deleted=True)
         )
+        await db.execute(
+            update(File).where(
+                and_(File.conversation_id == conversation_id, File.is_deleted == False)
+            ).values(is_deleted=True)
+        )
+        
+        await db.commit()
+        return True
 
 conversation_crud = CRUDConversation(Conversation) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
@@ -8,6 +8,7 @@ from app.models.file_version import FileVersion
 from app.schemas.file import FileCreate, FileUpdate
 from app.schemas.file_version import FileVersionCreate
 from uuid import UUID
+from app.core.exceptions import NotFoundError
 
 class CRUDFile(CRUDBase[File, FileCreate, FileUpdate]):
     async def create_file(
@@ -16,7 +17,7 @@ class CRUDFile(CRUDBase[File, FileCreate, FileUpdate]):
         description: Optional[str] = None, blob_path: Optional[str] = None,
         file_size: Optional[int] = None, category_id: Optional[UUID] = None, job_id: Optional[str] = None
     ) -> File:
-        """Create a new file with version 0"""
+        """Create a new file with version 0 (one transaction, one commit)"""
         file_data = FileCreate(
             conversation_id=conversation_id,
             filename=filename,
@@ -29,8 +30,9 @@ class CRUDFile(CRUDBase[File, FileCreate, FileUpdate]):
             job_id=job_id
         )
         
+        # Flushed only, for its id; the file and its versions commit together
         file_obj = await self.create_with_extra(
-            db, obj_in=file_data, extra_data={"user_id": user_id}
+            db, obj_in=file_data, extra_data={"user_id": user_id}, commit=False
         )
         
         version_data = FileVersionCreate(
@@ -44,8 +46,9 @@ class CRUDFile(CRUDBase[File, FileCreate, FileUpdate]):
         
         from .file_version import file_version_crud
         await file_version_crud.create_with_extra(
-            db, obj_in=version_data, extra_data={"is_current": True}
+            db, obj_in=version_data, extra_data={"is_current": True}, commit=False
         )
+        await db.commit()
         
         return file_obj
 
@@ -57,7 +60,7 @@ class CRUDFile(CRUDBase[File, FileCreate, FileUpdate]):
         file_size: Optional[int] = None, category_id: Optional[UUID] = None, 
         job_id: Optional[str] = None, html_blob_path: str
     ) -> File:
-        """Create a new file with original DOCX and initial HTML version"""
+        """Create a new file with original DOCX and initial HTML version (one transaction, one commit)"""
         # Create the file record (stores original DOCX info)
         file_data = FileCreate(
             conversation_id=conversation_id,
@@ -71,8 +74,9 @@ class CRUDFile(CRUDBase[File, FileCreate, FileUpdate]):
             job_id=job_id
         )
         
+        # Flushed only, for its id; the file and its versions commit together
         file_obj = await self.create_with_extra(
-            db, obj_in=file_data, extra_data={"user_id": user_id}
+            db, obj_in=file_data, extra_data={"user_id": user_id}, commit=False
         )
         
         # Create version 0 (original DOCX)
@@ -87,7 +91,7 @@ class CRUDFile(CRUDBase[File, FileCreate, FileUpdate]):
         
         from .file_version import file_version_crud
         await file_version_crud.create_with_extra(
-            db, obj_in=version_data_0, extra_data={"is_current": False}
+            db, obj_in=version_data_0, extra_data={"is_current": False}, commit=False
         )
         
         # Create version 1 (HTML)
@@ -101,11 +105,44 @@ class CRUDFile(CRUDBase[File, FileCreate, FileUpdate]):
         )
         
         await file_version_crud.create_with_extra(
-            db, obj_in=version_data_1, extra_data={"is_current": True}
+            db, obj_in=version_data_1, extra_data={"is_current": True}, commit=False
         )
+        await db.commit()
         
         return file_obj
 
+    async def get_with_current_version(
+        self, db: AsyncSession, *, id: UUID, user_id: str, raise_if_not_found: bool = True
+    ) -> Tuple[Optional[File], Optional[FileVersion]]:
+        """Get a user's file and its current version in one query"""
+        result = await db.execute(
+            select(File, FileVersion)
+            .outerjoin(
+                FileVersion,
+                and_(
+                    FileVersion.file_id == File.id,
+                    FileVersion.is_current == True,
+                    FileVersion.is_deleted == False
+                )
+            )
+            .where(
+                and_(
+                    File.id == id,
+                    File.user_id == user_id,
+                    File.is_deleted == False
+                )
+            )
+            .limit(1)
+        )
+        row = result.first()
+        
+        if row is None:
+            if raise_if_not_found:
+                raise NotFoundError(f"{self.model.__name__}")
+            return None, None
+        
+        return row[0], row[1]
+
     async def soft_delete(self, db: AsyncSession, *, file_id: UUID, user_id: str, raise_if_not_found: bool = True) -> bool:
         """Soft delete a file and all its versions"""
         from .file_version import file_version_crud
@@ -1,6 +1,6 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, update, func
+from sqlalchemy import select, insert, and_, update, func
 from sqlalchemy.orm import selectinload
 from .base import CRUDBase
 from app.models.file_version import FileVersion
@@ -14,10 +14,18 @@ class CRUDFileVersion(CRUDBase[FileVersion, FileVersionCreate, FileVersionUpdate
         self, db: AsyncSession, *, file_id: UUID, raise_if_not_found: bool = True
     ) -> Optional[FileVersion]:
         """Get the current version of a file"""
-        versions, _ = await self.get_by_fields(
-            db, filters={"file_id": file_id, "is_current": True}, limit=1
+        # Single-row probe on ix_file_versions_file_current; no count or ordering
+        version = await db.scalar(
+            select(FileVersion)
+            .where(
+                and_(
+                    FileVersion.file_id == file_id,
+                    FileVersion.is_current == True,
+                    FileVersion.is_deleted == False
+                )
+            )
+            .limit(1)
         )
-        version = versions[0] if versions else None
         
         if raise_if_not_found and version is None:
             raise NotFoundError("Current version")
@@ -28,32 +36,54 @@ class CRUDFileVersion(CRUDBase[FileVersion, FileVersionCreate, FileVersionUpdate
         self, db: AsyncSession, *, file_id: UUID, blob_path: str, file_size: int, 
         mime_type: str, change_description: Optional[str] = None
     ) -> FileVersion:
-        """Create a new file version"""
-        count = await self.count(db, filters={"file_id": file_id})
-        next_version = count
-        
-        await self.update_by_field(
-            db, field="file_id", value=file_id, obj_in={"is_current": False}
+        """Create a new file version (one statement, one commit)"""
+        # Number the version inside the INSERT instead of a separate COUNT round-trip;
+        # max + 1 also avoids reusing the number of a soft-deleted version
+        next_version = (
+            select(func.coalesce(func.max(FileVersion.version_number), -1) + 1)
+            .where(FileVersion.file_id == file_id)
+            .scalar_subquery()
         )
         
-        version_data = FileVersionCreate(
-            file_id=file_id,
-            version_number=next_version,
-            blob_path=blob_path,
-            file_size=file_size,
-            mime_type=mime_type,
-            change_description=change_description
-        )
-        
-        new_version = await self.create_with_extra(
-            db, obj_in=version_data, extra_data={"is_current": True}
+        # The old current version is demoted and the parent File.updated_at
+        # touched by data-modifying CTEs of the INSERT itself, so the whole
+        # change is one round-trip. All three see the same snapshot: the demote
+        # can't match the new row and max(version_number) excludes it
+        demote = (
+            update(FileVersion)
+            .where(
+                and_(
+                    FileVersion.file_id == file_id,
+                    FileVersion.is_current == True,
+                    FileVersion.is_deleted == False
+                )
+            )
+            .values(is_current=False)
+            .returning(FileVersion.id)
+            .cte("demote")
         )
-
-        # Also update the parent File.updated_at to reflect latest modification
-        await db.execute(
+        touch = (
             update(File)
             .where(and_(File.id == file_id, File.is_deleted == False))
             .values(updated_at=func.now())
+            .returning(File.id)
+            .cte("touch")
+        )
+        
+        new_version = await db.scalar(
+            insert(FileVersion)
+            .add_cte(demote)
+            .add_cte(touch)
+            .values(
+                file_id=file_id,
+                version_number=next_version,
+                blob_path=blob_path,
+                file_size=file_size,
+                mime_type=mime_type,
+                change_description=change_description,
+                is_current=True
+            )
+            .returning(FileVersion)
         )
         await db.commit()
 
@@ -63,12 +93,17 @@ class CRUDFileVersion(CRUDBase[FileVersion, FileVersionCreate, FileVersionUpdate
         self, db: AsyncSession, *, file_id: UUID, version_number: int, raise_if_not_found: bool = True
     ) -> Optional[FileVersion]:
         """Get a specific version of a file"""
-        versions, _ = await self.get_by_fields(
-            db, 
-            filters={"file_id": file_id, "version_number": version_number}, 
-            limit=1
+        version = await db.scalar(
+            select(FileVersion)
+            .where(
+                and_(
+                    FileVersion.file_id == file_id,
+                    FileVersion.version_number == version_number,
+                    FileVersion.is_deleted == False
+                )
+            )
+            .limit(1)
         )
-        version = versions[0] if versions else None
         
         if raise_if_not_found and version is None:
             raise NotFoundError(f"Version {version_number}")
@@ -87,7 +122,8 @@ class CRUDFileVersion(CRUDBase[FileVersion, FileVersionCreate, FileVersionUpdate
         file_ids, _ = await self.get_by_fields(
             db, 
             filters={"id": id, "is_deleted": False},
-            limit=1
+            limit=1,
+            with_total=False
         )
         
         if not file_ids:
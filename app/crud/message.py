@@ -1,13 +1,37 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, insert, and_, func
 from sqlalchemy.orm import selectinload
 from .base import CRUDBase
 from app.models.message import Message, MessageRole
 from app.schemas.message import MessageCreate, MessageUpdate
 from uuid import UUID
 
+# Built once and reused for every write from the message queue
+_INSERT_STMT = insert(Message)
+
 class CRUDMessage(CRUDBase[Message, MessageCreate, MessageUpdate]):
-    pass
+    async def bulk_insert(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+        """Insert already-built message rows with one statement and commit once"""
+        if not rows:
+            return 0
+        await db.execute(_INSERT_STMT, rows)
+        await db.commit()
+        return len(rows)
+
+    async def get_history_version(
+        self, db: AsyncSession, conversation_id: UUID
+    ) -> Tuple[int, Optional[datetime], Optional[datetime]]:
+        """Live message count and newest created_at/updated_at of a conversation.
+
+        Any insert, soft delete or edit of its messages changes the result.
+        """
+        result = await db.execute(
+            select(func.count(), func.max(Message.created_at), func.max(Message.updated_at))
+            .where(and_(Message.conversation_id == conversation_id, Message.is_deleted == False))
+        )
+        count, last_created, last_updated = result.one()
+        return count, last_created, last_updated
 
 message_crud = CRUDMessage(Message) 
\ No newline at end of file
@@ -1,12 +1,36 @@
-from typing import Optional, List
+from itertools import groupby
+from typing import Dict, Optional, List
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import selectinload
 from app.models.person import Person, PersonDetails
 from app.crud.base import CRUDBase
 from app.schemas.person import PersonCreate, PersonUpdate, PersonDetailsCreate, PersonDetailsUpdate
 
 
+# Built once at import; each call only binds its values
+_SELECT_PERSONS_BY_USER = (
+    select(Person)
+    .where(Person.user_id == bindparam("user_id"))
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+    .order_by(Person.created_at.desc())
+)
+_SELECT_PERSONS_BY_USERS = (
+    select(Person)
+    .where(Person.user_id.in_(bindparam("user_ids", expanding=True)))
+    .order_by(Person.user_id, Person.created_at.desc())
+    .options(selectinload(Person.person_details))
+)
+_SELECT_PERSON_BY_ID_AND_USER = select(Person).where(
+    Person.id == bindparam("person_id"),
+    Person.user_id == bindparam("user_id")
+)
+_SELECT_DETAILS_BY_PERSON = select(PersonDetails).where(PersonDetails.person_id == bindparam("person_id"))
+
+
 class CRUDPerson(CRUDBase[Person, PersonCreate, PersonUpdate]):
     """CRUD operations for Person model"""
     
@@ -20,14 +44,29 @@ class CRUDPerson(CRUDBase[Person, PersonCreate, PersonUpdate]):
     ) -> List[Person]:
         """Get all persons for a specific user"""
         result = await db.execute(
-            select(self.model)
-            .where(self.model.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .order_by(self.model.created_at.desc())
+            _SELECT_PERSONS_BY_USER, {"user_id": user_id, "skip": skip, "limit": limit}
         )
         return list(result.scalars().all())
     
+    async def get_by_user_ids(
+        self,
+        db: AsyncSession,
+        *,
+        user_ids: List[UUID]
+    ) -> Dict[UUID, List[Person]]:
+        """
+        Get the persons of several users in one query, newest first per user.
+        Details are loaded with one extra IN query rather than per person.
+        Users without persons are absent from the result.
+        """
+        if not user_ids:
+            return {}
+        result = await db.execute(_SELECT_PERSONS_BY_USERS, {"user_ids": list(user_ids)})
+        return {
+            user_id: list(persons)
+            for user_id, persons in groupby(result.scalars().all(), key=lambda person: person.user_id)
+        }
+    
     async def get_by_id_and_user(
         self,
         db: AsyncSession,
@@ -37,9 +76,7 @@ class CRUDPerson(CRUDBase[Person, PersonCreate, PersonUpdate]):
     ) -> Optional[Person]:
         """Get a person by ID, ensuring it belongs to the user"""
         result = await db.execute(
-            select(self.model)
-            .where(self.model.id == person_id)
-            .where(self.model.user_id == user_id)
+            _SELECT_PERSON_BY_ID_AND_USER, {"person_id": person_id, "user_id": user_id}
         )
         return result.scalar_one_or_none()
 
@@ -54,10 +91,7 @@ class CRUDPersonDetails(CRUDBase[PersonDetails, PersonDetailsCreate, PersonDetai
         person_id: UUID
     ) -> Optional[PersonDetails]:
         """Get person details by person_id"""
-        result = await db.execute(
-            select(self.model)
-            .where(self.model.person_id == person_id)
-        )
+        result = await db.execute(_SELECT_DETAILS_BY_PERSON, {"person_id": person_id})
         return result.scalar_one_or_none()
     
     async def upsert_by_person_id(
@@ -68,18 +102,21 @@ class CRUDPersonDetails(CRUDBase[PersonDetails, PersonDetailsCreate, PersonDetai
         data: dict
     ) -> PersonDetails:
         """Create or update person details for a person"""
-        existing = await self.get_by_person_id(db, person_id=person_id)
-        
-        if existing:
-            # Update existing
-            existing.data = data
-            await db.commit()
-            await db.refresh(existing)
-            return existing
-        else:
-            # Create new
-            obj_in = PersonDetailsCreate(person_id=person_id, data=data)
-            return await self.create(db, obj_in=obj_in)
+        # One atomic INSERT ... ON CONFLICT on the unique person_id instead of
+        # a SELECT followed by an UPDATE or INSERT (and a refresh)
+        stmt = pg_insert(PersonDetails).values(person_id=person_id, data=data)
+        stmt = (
+            stmt.on_conflict_do_update(
+                index_elements=[PersonDetails.person_id],
+                set_={"data": stmt.excluded.data, "updated_at": func.now()}
+            )
+            .returning(PersonDetails)
+            .execution_options(populate_existing=True)
+        )
+        result = await db.execute(stmt)
+        person_details = result.scalar_one()
+        await db.commit()
+        return person_details
 
 
 # Create instances
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from typing import Optional
+from sqlalchemy import select, and_, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Any, Dict, Optional
 
 from app.crud.base import CRUDBase
 from app.models.stripe_webhook import StripeWebhook
@@ -17,11 +18,32 @@ class StripeWebhookCreate(BaseModel):
     # webhook_timestamp set server-side by handler when saving
 
 
+# Built once at import; each call only binds the event id
+_SELECT_BY_EVENT_ID = select(StripeWebhook).where(
+    and_(StripeWebhook.event_id == bindparam("event_id"), StripeWebhook.is_deleted == False)
+)
+
+
 class CRUDStripeWebhook(CRUDBase[StripeWebhook, StripeWebhookCreate, BaseModel]):
     async def get_by_event_id(self, db: AsyncSession, event_id: str) -> Optional[StripeWebhook]:
-        result = await db.execute(
-            select(self.model).where(and_(self.model.event_id == event_id, self.model.is_deleted == False))
+        result = await db.execute(_SELECT_BY_EVENT_ID, {"event_id": event_id})
+        return result.scalar_one_or_none()
+
+    async def create_if_new(
+        self, db: AsyncSession, *, obj_in: StripeWebhookCreate, extra_data: Dict[str, Any]
+    ) -> Optional[Any]:
+        """
+        Insert the event unless its event_id is already stored.
+        Returns the new row id, or None if the event was seen before.
+        """
+        stmt = (
+            pg_insert(self.model)
+            .values(**obj_in.model_dump(exclude_unset=True), **extra_data)
+            .on_conflict_do_nothing(index_elements=["event_id"])
+            .returning(self.model.id)
         )
+        result = await db.execute(stmt)
+        await db.commit()
         return result.scalar_one_or_none()
 
 
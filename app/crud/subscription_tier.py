@@ -1,36 +1,51 @@
-from typing import Optional
+from typing import Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, bindparam
 
+from app.core.ref_cache import ref_cached
 from app.crud.base import CRUDBase
 from app.models.subscription_tier import SubscriptionTier
 from app.schemas.billing import SubscriptionTierCreate, SubscriptionTierUpdate
 
 
+# Built once at import; each call only binds its value, so SQLAlchemy reuses
+# the statement's cache key and compiled SQL
+_SELECT_BY_PLAN_NAME = select(SubscriptionTier).where(
+    and_(
+        SubscriptionTier.plan_name == bindparam("plan_name"),
+        SubscriptionTier.is_deleted == False
+    )
+)
+_SELECT_BY_STRIPE_PRICE_ID = select(SubscriptionTier).where(
+    and_(
+        SubscriptionTier.stripe_price_id == bindparam("stripe_price_id"),
+        SubscriptionTier.is_deleted == False
+    )
+)
+
+
 class CRUDSubscriptionTier(CRUDBase[SubscriptionTier, SubscriptionTierCreate, SubscriptionTierUpdate]):
+    @ref_cached(ttl=60)
     async def get_by_plan_name(self, db: AsyncSession, plan_name: str) -> Optional[SubscriptionTier]:
         """Get subscription tier by plan name"""
-        result = await db.execute(
-            select(self.model).where(
-                and_(
-                    self.model.plan_name == plan_name,
-                    self.model.is_deleted == False
-                )
-            )
-        )
+        result = await db.execute(_SELECT_BY_PLAN_NAME, {"plan_name": plan_name})
         return result.scalar_one_or_none()
     
+    @ref_cached(ttl=60)
     async def get_by_stripe_price_id(self, db: AsyncSession, stripe_price_id: str) -> Optional[SubscriptionTier]:
         """Get subscription tier by Stripe price ID"""
-        result = await db.execute(
-            select(self.model).where(
-                and_(
-                    self.model.stripe_price_id == stripe_price_id,
-                    self.model.is_deleted == False
-                )
-            )
-        )
+        result = await db.execute(_SELECT_BY_STRIPE_PRICE_ID, {"stripe_price_id": stripe_price_id})
         return result.scalar_one_or_none()
+    
+    def invalidate_cache(self) -> None:
+        """Drop cached tier lookups"""
+        self.get_by_plan_name.invalidate()
+        self.get_by_stripe_price_id.invalidate()
+    
+    def _invalidate(self, id: Any) -> None:
+        # Updates and deletes through CRUDBase
+        super()._invalidate(id)
+        self.invalidate_cache()
 
 
 subscription_tier = CRUDSubscriptionTier(SubscriptionTier)
@@ -1,28 +1,43 @@
-from typing import Optional
+from typing import Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, bindparam
 from datetime import datetime
 
+from app.core.ref_cache import ref_cached
 from app.crud.base import CRUDBase
 from app.models.token_pricing import TokenPricing
 from app.schemas.billing import TokenPricingCreate, TokenPricingUpdate
 
 
+# Built once at import; each call only binds the current time
+_SELECT_CURRENT_PRICING = (
+    select(TokenPricing)
+    .where(
+        and_(
+            TokenPricing.is_deleted == False,
+            TokenPricing.effective_date <= bindparam("now")
+        )
+    )
+    .order_by(TokenPricing.effective_date.desc())
+    .limit(1)
+)
+
+
 class CRUDTokenPricing(CRUDBase[TokenPricing, TokenPricingCreate, TokenPricingUpdate]):
+    @ref_cached(ttl=60)
     async def get_current_pricing(self, db: AsyncSession) -> Optional[TokenPricing]:
         """Get the current active token pricing based on effective date"""
-        result = await db.execute(
-            select(self.model)
-            .where(
-                and_(
-                    self.model.is_deleted == False,
-                    self.model.effective_date <= datetime.utcnow()
-                )
-            )
-            .order_by(self.model.effective_date.desc())
-            .limit(1)
-        )
+        result = await db.execute(_SELECT_CURRENT_PRICING, {"now": datetime.utcnow()})
         return result.scalar_one_or_none()
+    
+    def invalidate_cache(self) -> None:
+        """Drop the cached current pricing"""
+        self.get_current_pricing.invalidate()
+    
+    def _invalidate(self, id: Any) -> None:
+        # Updates and deletes through CRUDBase
+        super()._invalidate(id)
+        self.invalidate_cache()
 
 
 token_pricing = CRUDTokenPricing(TokenPricing)
@@ -1,6 +1,6 @@
-from typing import List, Tuple
+from typing import List, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, desc
+from sqlalchemy import select, and_, func, desc, literal
 from datetime import datetime
 
 from app.crud.base import CRUDBase
@@ -19,16 +19,35 @@ class CRUDUsageLog(CRUDBase[UsageLog, UsageLogCreate, UsageLogUpdate]):
         """Check if a usage_log entry already exists for a given request_id/user/feature."""
         if not request_id:
             return False
-        query = select(func.count(self.model.id)).where(
+        # SELECT 1 ... LIMIT 1 stops at the first match instead of counting them all
+        query = select(literal(1)).where(
             and_(
                 self.model.supabase_user_id == user_id,
                 self.model.feature_used == feature_type,
                 self.model.request_id == request_id,
                 self.model.is_deleted == False
             )
-        )
+        ).limit(1)
         result = await db.execute(query)
-        return (result.scalar() or 0) > 0
+        return result.scalar() is not None
+
+    async def get_logged_request_keys(
+        self,
+        db: AsyncSession,
+        request_ids: List[str]
+    ) -> Set[Tuple[str, FeatureType, str]]:
+        """(user, feature, request_id) of the given request_ids that are already logged"""
+        if not request_ids:
+            return set()
+        result = await db.execute(
+            select(self.model.supabase_user_id, self.model.feature_used, self.model.request_id).where(
+                and_(
+                    self.model.request_id.in_(request_ids),
+                    self.model.is_deleted == False
+                )
+            )
+        )
+        return {tuple(row) for row in result.all()}
 
     async def get_by_user_id_and_period(
         self, 
@@ -40,23 +59,33 @@ class CRUDUsageLog(CRUDBase[UsageLog, UsageLogCreate, UsageLogUpdate]):
         limit: int = 100
     ) -> Tuple[List[UsageLog], int]:
         """Get usage logs for a user within a date range"""
-        query = select(self.model).where(
+        filtered = select(self.model).where(
             and_(
                 self.model.supabase_user_id == user_id,
                 self.model.created_at >= start_date,
                 self.model.created_at <= end_date,
                 self.model.is_deleted == False
-        )).order_by(desc(self.model.created_at))
+        ))
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
-        
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
+        # Total matching rows comes back on every row of the page via a window count
+        query = (
+            filtered.add_columns(func.count().over().label("total"))
+            .order_by(desc(self.model.created_at))
+            .offset(skip)
+            .limit(limit)
+        )
         result = await db.execute(query)
-        items = result.scalars().all()
+        rows = result.all()
+        items = [row[0] for row in rows]
+        
+        if rows:
+            total = rows[0].total
+        elif skip:
+            # Page past the end: the window has no rows to report the total on
+            count_query = select(func.count()).select_from(filtered.subquery())
+            total = (await db.execute(count_query)).scalar()
+        else:
+            total = 0
         
         return items, total
     
@@ -1,12 +1,36 @@
+from decimal import Decimal
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, update, func as sql_func, cast, Numeric
+from sqlalchemy import select, and_, update, bindparam
 
 from app.crud.base import CRUDBase
 from app.models.user_subscription import UserSubscription, SubscriptionStatus
 from app.schemas.billing import UserSubscriptionCreate, UserSubscriptionUpdate
 
 
+# Built once at import; each call only binds its values, so SQLAlchemy reuses
+# the statement's cache key and compiled SQL
+_SELECT_BY_USER_AND_PERIOD = select(UserSubscription).where(
+    and_(
+        UserSubscription.supabase_user_id == bindparam("user_id"),
+        UserSubscription.billing_period == bindparam("billing_period"),
+        UserSubscription.is_deleted == False
+    )
+)
+_SELECT_ACTIVE = (
+    select(UserSubscription)
+    .where(
+        and_(
+            UserSubscription.supabase_user_id == bindparam("user_id"),
+            UserSubscription.status.in_([SubscriptionStatus.ACTIVE, SubscriptionStatus.LIMIT_REACHED]),
+            UserSubscription.is_deleted == False
+        )
+    )
+    .order_by(UserSubscription.created_at.desc())
+    .limit(1)
+)
+
+
 class CRUDUserSubscription(CRUDBase[UserSubscription, UserSubscriptionCreate, UserSubscriptionUpdate]):
     async def get_by_user_id_and_period(
         self, 
@@ -16,13 +40,7 @@ class CRUDUserSubscription(CRUDBase[UserSubscription, UserSubscriptionCreate, Us
     ) -> Optional[UserSubscription]:
         """Get user subscription by user ID and billing period"""
         result = await db.execute(
-            select(self.model).where(
-                and_(
-                    self.model.supabase_user_id == user_id,
-                    self.model.billing_period == billing_period,
-                    self.model.is_deleted == False
-                )
-            )
+            _SELECT_BY_USER_AND_PERIOD, {"user_id": user_id, "billing_period": billing_period}
         )
         return result.scalar_one_or_none()
     
@@ -32,18 +50,7 @@ class CRUDUserSubscription(CRUDBase[UserSubscription, UserSubscriptionCreate, Us
         user_id: str
     ) -> Optional[UserSubscription]:
         """Get the active subscription for a user"""
-        result = await db.execute(
-            select(self.model)
-            .where(
-                and_(
-                    self.model.supabase_user_id == user_id,
-                    self.model.status.in_([SubscriptionStatus.ACTIVE, SubscriptionStatus.LIMIT_REACHED]),
-                    self.model.is_deleted == False
-                )
-            )
-            .order_by(self.model.created_at.desc())
-            .limit(1)
-        )
+        result = await db.execute(_SELECT_ACTIVE, {"user_id": user_id})
         return result.scalar_one_or_none()
     
     async def increment_usage(
@@ -53,17 +60,22 @@ class CRUDUserSubscription(CRUDBase[UserSubscription, UserSubscriptionCreate, Us
         tokens: int, 
         cost: float
     ) -> Optional[UserSubscription]:
-        """Increment tokens consumed and dollar spent for a subscription (rounded to 3 decimals)"""
+        """Increment tokens consumed and dollar spent for a subscription.
+        
+        dollar_spent is NUMERIC(12,3), so the sum is exact and kept to 3 decimals
+        by the column itself.
+        
+        Runs in the caller's transaction; the caller commits."""
         result = await db.execute(
             update(self.model)
             .where(self.model.id == subscription_id)
             .values(
                 tokens_consumed=self.model.tokens_consumed + tokens,
-                dollar_spent=sql_func.round(cast(self.model.dollar_spent + cost, Numeric), 3)
+                # Bound as a decimal so it adds as numeric, not double precision
+                dollar_spent=self.model.dollar_spent + Decimal(str(cost))
             )
             .returning(self.model)
         )
-        await db.commit()
         return result.scalar_one_or_none()
     
     async def update_status(
@@ -72,13 +84,12 @@ class CRUDUserSubscription(CRUDBase[UserSubscription, UserSubscriptionCreate, Us
         subscription_id: str, 
         status: SubscriptionStatus
     ) -> bool:
-        """Update subscription status"""
+        """Update subscription status (in the caller's transaction; the caller commits)"""
         result = await db.execute(
             update(self.model)
             .where(self.model.id == subscription_id)
             .values(status=status)
         )
-        await db.commit()
         return result.rowcount > 0
 
 
@@ -5,7 +5,10 @@ import logging
 from dotenv import load_dotenv
 
 from app.routers import auth
+from app.core.auth import load_jwks
+from app.core.usage_buffer import start_usage_buffer, stop_usage_buffer
 from app.core.config import settings
+from app.core.database import warm_up_pool
 
 load_dotenv()
 
@@ -16,6 +19,11 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()]
 )
 
+# Auth runs on every request; keep its debug/info chatter out of production logs
+if settings.environment != "development":
+    logging.getLogger("app.core.auth").setLevel(logging.WARNING)
+    logging.getLogger("app.services.supabase_service").setLevel(logging.WARNING)
+
 app = FastAPI(
     title="Audria API",
     description="FastAPI backend for Audria with Supabase authentication",
@@ -32,6 +40,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def warm_auth_keys():
+    # Pre-load Supabase signing keys so the first requests verify tokens locally
+    if settings.supabase_url:
+        try:
+            await load_jwks()
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Could not pre-load Supabase JWKS: {e}")
+
+@app.on_event("startup")
+async def warm_db_pool():
+    # Connect the pool up front so the first requests reuse open connections
+    try:
+        await warm_up_pool()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Could not pre-open database connections: {e}")
+
+@app.on_event("startup")
+async def start_background_writers():
+    await start_usage_buffer()
+
+@app.on_event("shutdown")
+async def stop_background_writers():
+    # Flush buffered usage rows before the process exits
+    await stop_usage_buffer()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
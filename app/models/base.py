@@ -1,9 +1,22 @@
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, DateTime, func, Boolean
 from datetime import datetime
+import os
+import time
+import uuid
 
 Base = declarative_base()
 
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48-bit Unix milliseconds followed
+    by random bits, so new primary keys land on the right edge of the btree.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
 class TimestampMixin:
     """Mixin to add created_at and updated_at timestamps to models"""
     created_at = Column(DateTime, default=func.now(), nullable=False)
@@ -1,13 +1,14 @@
 from sqlalchemy import Column, String, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
-from .base import Base, TimestampMixin
+from .base import Base, TimestampMixin, uuid7
 
 class Category(Base, TimestampMixin):
     __tablename__ = "categories"
+    # Read on most file requests and rarely changed: cache CRUDBase.get() lookups
+    __crud_cache__ = True
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, index=True)
     name = Column(String(255), nullable=False, unique=True)
     description = Column(Text, nullable=True)
     
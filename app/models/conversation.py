@@ -1,13 +1,12 @@
 from sqlalchemy import Column, String, Text, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
-from .base import Base, TimestampMixin
+from .base import Base, TimestampMixin, uuid7
 
 class Conversation(Base, TimestampMixin):
     __tablename__ = "conversations"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, index=True)
     user_id = Column(String, nullable=False, index=True)
     title = Column(String(255), nullable=True)
     
@@ -1,13 +1,12 @@
 from sqlalchemy import Column, String, Text, ForeignKey, Boolean, Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
-from .base import Base, TimestampMixin
+from .base import Base, TimestampMixin, uuid7
 
 class File(Base, TimestampMixin):
     __tablename__ = "files"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, index=True)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id"), nullable=True, index=True)
     user_id = Column(String, nullable=False, index=True)
     category_id = Column(UUID(as_uuid=True), ForeignKey("categories.id"), nullable=True, index=True)
@@ -1,13 +1,23 @@
-from sqlalchemy import Column, String, Text, ForeignKey, Boolean, Integer
+from sqlalchemy import Column, String, Text, ForeignKey, Boolean, Integer, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
-from .base import Base, TimestampMixin
+from .base import Base, TimestampMixin, uuid7
 
 class FileVersion(Base, TimestampMixin):
     __tablename__ = "file_versions"
+    __table_args__ = (
+        Index(
+            "ix_file_versions_file_current",
+            "file_id", "is_current",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        Index(
+            "ix_file_versions_file_version_number",
+            "file_id", "version_number",
+        ),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, index=True)
     file_id = Column(UUID(as_uuid=True), ForeignKey("files.id"), nullable=False, index=True)
     version_number = Column(Integer, nullable=False)
     blob_path = Column(String(500), nullable=False)
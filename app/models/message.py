@@ -1,9 +1,8 @@
 from sqlalchemy import Column, String, Text, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
 import enum
-from .base import Base, TimestampMixin
+from .base import Base, TimestampMixin, uuid7
 
 class MessageRole(str, enum.Enum):
     USER = "user"
@@ -13,7 +12,7 @@ class MessageRole(str, enum.Enum):
 class Message(Base, TimestampMixin):
     __tablename__ = "messages"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7, index=True)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id"), nullable=False, index=True)
     role = Column(Enum(MessageRole), nullable=False)
     content = Column(Text, nullable=False)
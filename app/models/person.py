@@ -2,15 +2,14 @@ from sqlalchemy import Column, Text, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
-import uuid
-from .base import Base
+from .base import Base, uuid7
 
 
 class Person(Base):
     """Model for storing general person information"""
     __tablename__ = "persons"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
     name = Column(Text, nullable=False)
     generation = Column(Text, nullable=True)
@@ -25,7 +24,7 @@ class PersonDetails(Base):
     """Model for storing detailed person information in JSONB format"""
     __tablename__ = "person_details"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     person_id = Column(UUID(as_uuid=True), ForeignKey("persons.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
     data = Column(JSONB, nullable=False, server_default="{}")
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -1,13 +1,12 @@
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
-from .base import Base, TimestampMixin
+from .base import Base, TimestampMixin, uuid7
 
 
 class StripeWebhook(Base, TimestampMixin):
     __tablename__ = "stripe_webhooks"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     # Stripe event id for idempotency
     event_id = Column(String(255), nullable=False, unique=True, index=True)
 
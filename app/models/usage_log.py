@@ -1,8 +1,7 @@
-from sqlalchemy import Column, String, Integer, Float, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
-import uuid
+from sqlalchemy import Column, String, Text, Integer, Float, Index, Enum as SQLEnum, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 import enum
-from .base import Base, TimestampMixin
+from .base import Base, TimestampMixin, uuid7
 
 class FeatureType(str, enum.Enum):
     """Feature types for usage tracking"""
@@ -16,9 +15,28 @@ class FeatureType(str, enum.Enum):
 class UsageLog(Base, TimestampMixin):
     """Tracks every request and computes its token and dollar cost"""
     __tablename__ = "usage_log"
+    __table_args__ = (
+        Index(
+            "ix_usage_log_user_created",
+            "supabase_user_id", "created_at",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        Index(
+            "ix_usage_log_user_feature_created",
+            "supabase_user_id", "feature_used", "created_at",
+            postgresql_where=text("is_deleted = false"),
+            postgresql_include=["tokens_used", "dollar_cost"],
+        ),
+        Index(
+            "ix_usage_log_created_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    supabase_user_id = Column(String, nullable=False, index=True)  # References user in Supabase
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    supabase_user_id = Column(Text, nullable=False)  # References user in Supabase
     feature_used = Column(SQLEnum(FeatureType), nullable=False)  # Chat, Inline Revision, Orchestrator, Ingestion
     tokens_used = Column(Integer, nullable=False)  # Tokens consumed in request
     dollar_cost = Column(Float, nullable=False)  # Dollar cost of the request
@@ -32,5 +50,5 @@ class UsageLog(Base, TimestampMixin):
     
     # Optional metadata for tracking
     request_id = Column(String(255), nullable=True)  # Job ID or request identifier
-    meta_data = Column(String, nullable=True)  # Additional metadata as JSON string
+    meta_data = Column(JSONB, nullable=True)  # Additional metadata as JSON
 
@@ -1,8 +1,7 @@
-from sqlalchemy import Column, String, Integer, Float, Date, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Numeric, Date, Index, Enum as SQLEnum, text
 from sqlalchemy.dialects.postgresql import UUID
-import uuid
 import enum
-from .base import Base, TimestampMixin
+from .base import Base, TimestampMixin, uuid7
 
 class SubscriptionStatus(str, enum.Enum):
     """Subscription status enum"""
@@ -15,12 +14,31 @@ class SubscriptionStatus(str, enum.Enum):
 class UserSubscription(Base, TimestampMixin):
     """Aggregates total token and dollar usage per billing cycle"""
     __tablename__ = "user_subscriptions"
+    __table_args__ = (
+        Index(
+            "ix_user_subscriptions_stripe_customer",
+            "stripe_customer_id",
+            postgresql_where=text("stripe_customer_id IS NOT NULL"),
+        ),
+        Index(
+            "ix_user_subscriptions_stripe_subscription",
+            "stripe_subscription_id",
+            postgresql_where=text("stripe_subscription_id IS NOT NULL"),
+        ),
+        # get_active_subscription: newest live ACTIVE/LIMIT_REACHED row per user,
+        # read straight off the index (backward scan) with no sort
+        Index(
+            "ix_user_subscriptions_user_active_created",
+            "supabase_user_id", "created_at",
+            postgresql_where=text("is_deleted = false AND status IN ('ACTIVE', 'LIMIT_REACHED')"),
+        ),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     supabase_user_id = Column(String, nullable=False, index=True)  # References user in Supabase
     subscription_plan = Column(String(100), nullable=False)  # Active plan name (Free, Pro, Enterprise)
     tokens_consumed = Column(Integer, default=0, nullable=False)  # Tokens consumed in cycle
-    dollar_spent = Column(Float, default=0.0, nullable=False)  # Dollar cost accumulated in cycle
+    dollar_spent = Column(Numeric(12, 3, asdecimal=False), default=0, nullable=False)  # Dollar cost accumulated in cycle (exact, 3 decimals)
     status = Column(SQLEnum(SubscriptionStatus), default=SubscriptionStatus.ACTIVE, nullable=False)
     billing_period = Column(String(20), nullable=False)  # Format: YYYY-MM
     start_date = Column(Date, nullable=False)  # Billing cycle start
@@ -359,7 +359,7 @@ async def get_subscription_tiers(
     Public endpoint - no authentication required.
     """
     try:
-        tiers, _ = await subscription_tier.get_multi(db, skip=0, limit=100)
+        tiers, _ = await subscription_tier.get_multi(db, skip=0, limit=100, with_total=False)
         return {
             "success": True,
             "tiers": [SubscriptionTierResponse.from_orm(tier) for tier in tiers]
@@ -411,12 +411,7 @@ async def stripe_webhook(
                 detail=webhook_result.get("error", "Webhook processing failed")
             )
         
-        # Idempotency: store event locally if not seen before
         event_id = event.get("id")
-        if event_id:
-            existing = await stripe_webhook_crud.get_by_event_id(db, event_id)
-            if existing:
-                return JSONResponse(content={"success": True, "message": "Event already processed", "action": webhook_result.get("action")})
 
         # Get user ID from customer
         customer_id = webhook_result.get("customer_id")
@@ -428,9 +423,10 @@ async def stripe_webhook(
         if not user_id:
             return JSONResponse(content={"success": True, "message": "User ID not found for customer"})
         
-        # Persist webhook locally (no Supabase metadata updates)
+        # Persist webhook locally (no Supabase metadata updates). The insert is
+        # also the idempotency check: a duplicate event_id inserts nothing.
         try:
-            await stripe_webhook_crud.create_with_extra(
+            webhook_id = await stripe_webhook_crud.create_if_new(
                 db,
                 obj_in=StripeWebhookCreate(
                     event_id=event_id or "",
@@ -444,9 +440,11 @@ async def stripe_webhook(
                     "webhook_timestamp": datetime.utcnow()
                 }
             )
+            if event_id and webhook_id is None:
+                return JSONResponse(content={"success": True, "message": "Event already processed", "action": webhook_result.get("action")})
         except Exception:
             # Don't fail the webhook entirely due to persistence error
-            pass
+            await db.rollback()
 
         # Update local database subscription status/plan
         if webhook_result.get("action") in ["subscription_created", "subscription_updated", "subscription_cancelled", "payment_succeeded", "payment_failed"]:
@@ -20,7 +20,7 @@ async def get_categories(
     include_inactive: bool = False
 ):
     """Get all categories"""
-    categories, _ = await category_crud.get_multi(db, skip=skip, limit=limit, include_deleted=include_inactive)
+    categories, _ = await category_crud.get_multi(db, skip=skip, limit=limit, include_deleted=include_inactive, with_total=False)
     return categories
 
 @router.get("/{category_id}", response_model=Category)
@@ -46,7 +46,7 @@ async def create_category(
 ):
     """Create a new category"""
     # Use base CRUD get_by_field method instead of get_by_name
-    existing_categories, _ = await category_crud.get_by_field(db, field="name", value=category_in.name, limit=1)
+    existing_categories, _ = await category_crud.get_by_field(db, field="name", value=category_in.name, limit=1, with_total=False)
     existing_category = existing_categories[0] if existing_categories else None
     
     if existing_category:
@@ -75,7 +75,7 @@ async def update_category(
     
     if category_in.name and category_in.name != category.name:
         # Use base CRUD get_by_field method instead of get_by_name
-        existing_categories, _ = await category_crud.get_by_field(db, field="name", value=category_in.name, limit=1)
+        existing_categories, _ = await category_crud.get_by_field(db, field="name", value=category_in.name, limit=1, with_total=False)
         existing_category = existing_categories[0] if existing_categories else None
         
         if existing_category:
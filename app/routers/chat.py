@@ -10,7 +10,7 @@ from app.core.database import get_db
 from app.crud.message import message_crud
 from uuid import UUID as _UUID
 from app.core.message_queue import queue_user_message, queue_assistant_message
-from app.core.prompts import SYSTEM_PROMPT_GENERAL_CHAT
+from app.core.prompts import SYSTEM_MESSAGE_GENERAL_CHAT
 import time
 
 router = APIRouter()
@@ -32,7 +32,7 @@ async def send_chat_message(
         client = AsyncOpenAI(api_key=settings.openai_api_key)
         
         # Build OpenAI messages with conversation history if available
-        messages = [{"role": "system", "content": SYSTEM_PROMPT_GENERAL_CHAT}]
+        messages = [SYSTEM_MESSAGE_GENERAL_CHAT]
         if chat_request.conversation_id:
             try:
                 conv_uuid = _UUID(chat_request.conversation_id)
@@ -41,7 +41,8 @@ async def send_chat_message(
                     filters={"conversation_id": conv_uuid},
                     limit=24,
                     order_by="created_at",
-                    order_desc=True
+                    order_desc=True,
+                    with_total=False
                 )
                 # Use most recent messages first from DB, then reverse to chronological
                 for m in reversed(history):
@@ -125,11 +125,14 @@ async def get_current_file_version(
     db: AsyncSession = Depends(get_db)
 ):
     """Get the current version of a file (works for both conversation and job files)"""
-    await file_crud.get_by_user_id(
+    _, current_version = await file_crud.get_with_current_version(
         db, id=file_id, user_id=current_user.user_id
     )
     
-    return await file_version_crud.get_current_version(db, file_id=file_id)
+    if current_version is None:
+        raise NotFoundError("Current version")
+    
+    return current_version
 
 @router.get("/file/{file_id}/version/{version_number}", response_model=FileVersionResponse)
 @handle_database_errors
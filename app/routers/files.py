@@ -224,14 +224,11 @@ async def get_file_html(
     db: AsyncSession = Depends(get_db)
 ):
     """Get the HTML content of a file from blob storage"""
-    file_obj = await file_crud.get_by_user_id(
+    # File (ownership check) and its current version, which should be HTML
+    file_obj, current_version = await file_crud.get_with_current_version(
         db, id=file_id, user_id=current_user.user_id
     )
     
-    # Get current version (should be HTML)
-    from app.crud.file_version import file_version_crud
-    current_version = await file_version_crud.get_current_version(db, file_id=file_id)
-    
     if not current_version or current_version.mime_type != "text/html":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Optional, List
 from datetime import datetime, date
 from uuid import UUID
 from enum import Enum
@@ -122,7 +122,7 @@ class UsageLogBase(BaseModel):
     project_id: Optional[str] = None
     file_id: Optional[str] = None
     request_id: Optional[str] = None
-    meta_data: Optional[str] = None
+    meta_data: Optional[Any] = None
 
 class UsageLogCreate(UsageLogBase):
     pass
@@ -130,7 +130,7 @@ class UsageLogCreate(UsageLogBase):
 class UsageLogUpdate(BaseModel):
     tokens_used: Optional[int] = None
     dollar_cost: Optional[float] = None
-    meta_data: Optional[str] = None
+    meta_data: Optional[Any] = None
 
 class UsageLogResponse(UsageLogBase):
     id: UUID
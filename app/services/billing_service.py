@@ -1,7 +1,10 @@
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, bindparam
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime, date
 import calendar
+import json
 from dateutil.relativedelta import relativedelta
 
 from app.crud.token_pricing import token_pricing
@@ -22,6 +25,13 @@ from app.schemas.billing import (
 )
 
 
+_BILL_AND_LOG = text(
+    "SELECT * FROM bill_and_log("
+    ":user_id, CAST(:feature AS featuretype), :tokens, :prompt_tokens, :completion_tokens, "
+    ":status, :latency_ms, :model_used, :project_id, :file_id, :request_id, :meta_data)"
+).bindparams(bindparam("meta_data", type_=JSONB))
+
+
 class BillingService:
     """Service for handling billing operations and usage tracking"""
     
@@ -40,6 +50,16 @@ class BillingService:
         year, month = map(int, billing_period.split("-"))
         return date(year, month, 1)
     
+    @staticmethod
+    def parse_meta_data(meta_data: Any) -> Any:
+        """Callers pass metadata as a JSON string; store it as a JSON value"""
+        if isinstance(meta_data, str):
+            try:
+                return json.loads(meta_data)
+            except ValueError:
+                pass
+        return meta_data
+    
     @staticmethod
     def get_billing_period_end_date(billing_period: str) -> date:
         """Get the end date of a billing period from YYYY-MM format"""
@@ -101,10 +121,14 @@ class BillingService:
         db: AsyncSession, 
         user_id: str,
         feature_type: FeatureType,
-        estimated_tokens: Optional[int] = None
+        estimated_tokens: Optional[int] = None,
+        *,
+        include_details: bool = True
     ) -> CheckSubscriptionResponse:
         """
         Check if user can make a request based on their subscription limits.
+        With include_details=False an allowed response carries no
+        subscription/tier payload (denied responses always do).
         """
         # Get or create user subscription
         subscription, created = await self.get_or_create_user_subscription(db, user_id)
@@ -178,6 +202,16 @@ class BillingService:
         #     )
         
         # All checks passed
+        if not include_details:
+            return CheckSubscriptionResponse(
+                success=True,
+                allowed=True,
+                message="Request allowed",
+                subscription=None,
+                tier=None,
+                tokens_remaining=tokens_remaining
+            )
+        
         return CheckSubscriptionResponse(
             success=True,
             allowed=True,
@@ -222,8 +256,8 @@ class BillingService:
         # Calculate cost (rounded to 3 decimal places)
         dollar_cost = round((tokens_used / 1000.0) * pricing.usd_per_1k_tokens, 3)
         
-        # Create usage log entry
-        usage_log_entry = await usage_log.create(
+        # Create usage log entry; flushed only, it commits together with the charge
+        usage_log_entry = await usage_log.create_with_extra(
             db,
             obj_in=UsageLogCreate(
                 supabase_user_id=user_id,
@@ -238,10 +272,136 @@ class BillingService:
                 project_id=project_id,
                 file_id=file_id,
                 request_id=request_id,
-                meta_data=meta_data
+                meta_data=self.parse_meta_data(meta_data)
+            ),
+            extra_data={},
+            commit=False
+        )
+        
+        updated_subscription, limit_reached = await self._charge_subscription(
+            db, user_id, tokens_used, dollar_cost
+        )
+        await db.commit()
+        
+        if not updated_subscription:
+            return LogUsageResponse(
+                success=False,
+                message="Failed to update subscription",
+                usage_log=UsageLogResponse.from_orm(usage_log_entry),
+                subscription=None,
+                limit_reached=False
             )
+        
+        return LogUsageResponse(
+            success=True,
+            message="Usage logged successfully",
+            usage_log=UsageLogResponse.from_orm(usage_log_entry),
+            subscription=UserSubscriptionResponse.from_orm(updated_subscription),
+            limit_reached=limit_reached
+        )
+    
+    async def bill_and_log(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        feature_type: FeatureType,
+        tokens_used: int,
+        request_id: Optional[str] = None,
+        meta_data: Optional[str] = None,
+        *,
+        latency_ms: Optional[int] = None,
+        model_used: Optional[str] = None,
+        project_id: Optional[str] = None,
+        file_id: Optional[str] = None,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Same as log_usage, but done by the bill_and_log database function in one
+        round-trip. Returns the function's row: logged, allowed,
+        tokens_remaining and limit_reached.
+        """
+        result = await db.execute(
+            _BILL_AND_LOG,
+            self._bill_and_log_params({
+                "user_id": user_id,
+                "feature_type": feature_type,
+                "tokens_used": tokens_used,
+                "request_id": request_id,
+                "meta_data": meta_data,
+                "latency_ms": latency_ms,
+                "model_used": model_used,
+                "project_id": project_id,
+                "file_id": file_id,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "status": status,
+            })
         )
+        row = result.mappings().one()
+        await db.commit()
+        return dict(row)
+    
+    async def bill_and_log_batch(
+        self,
+        db: AsyncSession,
+        entries: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Bill a batch of usage entries (keyword arguments of log_usage) through the
+        bill_and_log function: one pipelined executemany and one commit.
         
+        Entries carrying a request_id already billed, in the database or earlier
+        in the batch, are skipped: a request retried while its first row was
+        still buffered must not be charged twice. Returns the number billed.
+        """
+        request_ids = [entry["request_id"] for entry in entries if entry.get("request_id")]
+        seen = await usage_log.get_logged_request_keys(db, request_ids)
+        params = []
+        for entry in entries:
+            request_id = entry.get("request_id")
+            if request_id:
+                key = (entry["user_id"], entry["feature_type"], request_id)
+                if key in seen:
+                    continue
+                seen.add(key)
+            params.append(self._bill_and_log_params(entry))
+        if not params:
+            return 0
+        await db.execute(_BILL_AND_LOG, params)
+        await db.commit()
+        return len(params)
+    
+    def _bill_and_log_params(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Bind parameters of the bill_and_log function for one usage entry"""
+        return {
+            "user_id": entry["user_id"],
+            "feature": entry["feature_type"].name,
+            "tokens": entry["tokens_used"],
+            "prompt_tokens": entry.get("prompt_tokens"),
+            "completion_tokens": entry.get("completion_tokens"),
+            "status": entry.get("status"),
+            "latency_ms": entry.get("latency_ms"),
+            "model_used": entry.get("model_used"),
+            "project_id": entry.get("project_id"),
+            "file_id": entry.get("file_id"),
+            "request_id": entry.get("request_id"),
+            "meta_data": self.parse_meta_data(entry.get("meta_data")),
+        }
+    
+    async def _charge_subscription(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        tokens_used: int,
+        dollar_cost: float
+    ) -> Tuple[Optional[Any], bool]:
+        """
+        Add usage to the user's current subscription and flag it when the tier
+        limit is reached. Returns (updated_subscription, limit_reached).
+        Runs in the caller's transaction; the caller commits.
+        """
         # Get or create user subscription
         subscription, _ = await self.get_or_create_user_subscription(db, user_id)
         
@@ -254,13 +414,7 @@ class BillingService:
         )
         
         if not updated_subscription:
-            return LogUsageResponse(
-                success=False,
-                message="Failed to update subscription",
-                usage_log=UsageLogResponse.from_orm(usage_log_entry),
-                subscription=None,
-                limit_reached=False
-            )
+            return None, False
         
         # Check if limit reached
         tier = await subscription_tier.get_by_plan_name(db, updated_subscription.subscription_plan)
@@ -276,13 +430,7 @@ class BillingService:
             updated_subscription.status = SubscriptionStatus.LIMIT_REACHED
             limit_reached = True
         
-        return LogUsageResponse(
-            success=True,
-            message="Usage logged successfully",
-            usage_log=UsageLogResponse.from_orm(usage_log_entry),
-            subscription=UserSubscriptionResponse.from_orm(updated_subscription),
-            limit_reached=limit_reached
-        )
+        return updated_subscription, limit_reached
     
     async def get_subscription_stats(
         self, 
@@ -37,7 +37,7 @@ class FileUploadService:
         if category_id is None:
             try:
                 # Get the "conversations" category by name
-                categories, _ = await category_crud.get_by_field(db, field="name", value="conversations", limit=1)
+                categories, _ = await category_crud.get_by_field(db, field="name", value="conversations", limit=1, with_total=False)
                 if categories:
                     category_id = categories[0].id
                 else:
@@ -2,9 +2,12 @@ from supabase import create_client, Client
 from app.core.config import settings
 from typing import Optional, Dict, Any
 import asyncio
+import logging
 from functools import wraps
 import inspect
 
+logger = logging.getLogger(__name__)
+
 class SupabaseService:
     def __init__(self):
         self.supabase = None
@@ -143,10 +146,12 @@ class SupabaseService:
                 "user": response.user
             }
         except Exception as e:
-            print(f"Error getting user from Supabase: {e}")
+            logger.debug(f"Error getting user from Supabase: {e}")
             return {
                 "success": False,
-                "error": str(e)
+                "error": str(e),
+                # HTTP status from Supabase Auth when it rejected the token (None for network errors)
+                "status": getattr(e, "status", None)
             }
 
     async def get_user_by_id(self, user_id: str) -> Dict[str, Any]:
@@ -18,6 +18,10 @@ if __name__ == "__main__":
         app,
         host=host,
         port=port,
-        log_level="info"
+        log_level="info",
+        # uvloop and httptools come with uvicorn[standard]; pin them so a
+        # missing install fails at startup instead of falling back to asyncio
+        loop="uvloop",
+        http="httptools"
     )
 
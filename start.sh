@@ -9,5 +9,5 @@ echo "📍 Binding to port: $PORT"
 echo "🌐 Host: 0.0.0.0"
 
 # Start the server with explicit port binding
-exec poetry run uvicorn app.main:app --host 0.0.0.0 --port "$PORT" --log-level info
+exec poetry run uvicorn app.main:app --host 0.0.0.0 --port "$PORT" --log-level info --loop uvloop --http httptools
 